@@ -1,11 +1,165 @@
 import pandas as pd
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import TransientError
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def create_kg():
+MAX_RETRIES = 5
+
+_INT_COLUMNS = ['food_satisfaction_score', 'arrival_delay_minutes', 'actual_flown_miles', 'number_of_legs']
+
+# Uniqueness constraints give every MERGE key a backing index, so MERGE
+# does an index lookup instead of a label scan. Created in their own
+# session so the indexes are online before ingest starts.
+_CONSTRAINTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Passenger) REQUIRE p.record_locator IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (j:Journey) REQUIRE j.feedback_ID IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Airport) REQUIRE a.station_code IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (f:Flight) REQUIRE (f.flight_number, f.fleet_type_description) IS UNIQUE",
+]
+
+# Airports and flights are shared by many journeys, so they are merged
+# up front in a single pass. _MERGE_CYPHER only MATCHes them, which keeps
+# the concurrent workers from racing to create the same nodes.
+_ROUTE_CYPHER = """
+UNWIND $rows AS row
+MERGE (f:Flight {flight_number: row.flight_number, fleet_type_description: row.fleet_type_description})
+
+MERGE (origin:Airport {station_code: row.origin_code})
+MERGE (dest:Airport {station_code: row.dest_code})
+
+MERGE (f)-[:DEPARTS_FROM]->(origin)
+MERGE (f)-[:ARRIVES_AT]->(dest)
+"""
+
+_MERGE_CYPHER = """
+UNWIND $rows AS row
+MERGE (p:Passenger {record_locator: row.record_locator})
+SET p.loyalty_program_level = row.loyalty_program_level,
+    p.generation = row.generation
+
+MERGE (j:Journey {feedback_ID: row.feedback_ID})
+SET j.food_satisfaction_score = row.food_satisfaction_score,
+    j.arrival_delay_minutes = row.arrival_delay_minutes,
+    j.actual_flown_miles = row.actual_flown_miles,
+    j.number_of_legs = row.number_of_legs,
+    j.passenger_class = row.passenger_class
+
+WITH p, j, row
+MATCH (f:Flight {flight_number: row.flight_number, fleet_type_description: row.fleet_type_description})
+
+MERGE (p)-[:TOOK]->(j)
+MERGE (j)-[:ON]->(f)
+"""
+
+# Server-side alternative to the Python ingest: Neo4j reads the CSV itself
+# (from its import/ directory or over HTTP) and batches the writes. CALL {}
+# IN TRANSACTIONS needs an auto-commit transaction, i.e. a plain session.run.
+_LOAD_CSV_CYPHER = """
+LOAD CSV WITH HEADERS FROM $csv_url AS row
+CALL {
+    WITH row
+    MERGE (p:Passenger {record_locator: row.record_locator})
+    SET p.loyalty_program_level = row.loyalty_program_level,
+        p.generation = row.generation
+
+    MERGE (j:Journey {feedback_ID: row.feedback_ID})
+    SET j.food_satisfaction_score = toInteger(row.food_satisfaction_score),
+        j.arrival_delay_minutes = toInteger(row.arrival_delay_minutes),
+        j.actual_flown_miles = toInteger(row.actual_flown_miles),
+        j.number_of_legs = toInteger(row.number_of_legs),
+        j.passenger_class = row.passenger_class
+
+    MERGE (f:Flight {flight_number: row.flight_number, fleet_type_description: row.fleet_type_description})
+
+    MERGE (origin:Airport {station_code: row.origin_station_code})
+    MERGE (dest:Airport {station_code: row.destination_station_code})
+
+    MERGE (p)-[:TOOK]->(j)
+    MERGE (j)-[:ON]->(f)
+    MERGE (f)-[:DEPARTS_FROM]->(origin)
+    MERGE (f)-[:ARRIVES_AT]->(dest)
+} IN TRANSACTIONS OF 5000 ROWS
+"""
+
+async def write_batches(session, query, rows, batch_size, semaphore=None):
+    """
+    Send rows through an UNWIND query, one transaction per batch.
+    Batches that hit a deadlock or other transient error are retried.
+    The optional semaphore caps how many batches are in flight across workers.
+    """
+    semaphore = semaphore or asyncio.Semaphore(1)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        for attempt in range(1, MAX_RETRIES + 1):
+            async with semaphore:
+                tx = None
+                try:
+                    # BEGIN itself fails transiently when a lock or the leader
+                    # is unavailable, so it is retried too
+                    tx = await session.begin_transaction()
+                    await tx.run(query, rows=batch)
+                    await tx.commit()
+                    break
+                except TransientError:
+                    if attempt == MAX_RETRIES:
+                        raise
+                finally:
+                    if tx is not None:
+                        await tx.close()
+            await asyncio.sleep(0.1 * 2 ** attempt)
+
+async def ingest_csv(driver, csv_file):
+    """
+    Ingest the survey CSV from this process: the file is streamed in chunks
+    and written through batched UNWIND statements by concurrent workers.
+    """
+    batch_size = 1000
+    n_workers = int(os.getenv('KG_INGEST_WORKERS', 8))
+    concurrency = int(os.getenv('KG_INGEST_CONCURRENCY', 4))
+
+    chunk_size = 50_000
+    semaphore = asyncio.Semaphore(concurrency)
+    processed = 0
+
+    async def ingest_bin(bin_rows):
+        nonlocal processed
+        # A session runs one transaction at a time, so every worker opens its own
+        async with driver.session() as session:
+            await write_batches(session, _MERGE_CYPHER, bin_rows, batch_size, semaphore)
+        processed += len(bin_rows)
+        print(f"Processed {processed} rows...")
+
+    # Stream the CSV so peak memory stays at one chunk and ingest starts
+    # before the whole file has been parsed
+    # Column types are fixed by the parser, so no per-row or per-chunk casts are needed
+    dtypes = {col: 'int64' for col in _INT_COLUMNS}
+    dtypes['flight_number'] = str # Treat as string to be safe or int
+    reader = pd.read_csv(csv_file, chunksize=chunk_size, dtype=dtypes)
+    for df in reader:
+        # Disjoint bins by passenger so no two workers ever MERGE the same Passenger
+        df['bin'] = pd.util.hash_pandas_object(df['record_locator'], index=False) % n_workers
+
+        # Rename once on the whole chunk, then hand plain dicts to the driver
+        df = df.rename(columns={
+            'origin_station_code': 'origin_code',
+            'destination_station_code': 'dest_code',
+        })
+
+        shared_rows = df.drop_duplicates(
+            ['flight_number', 'fleet_type_description', 'origin_code', 'dest_code']
+        ).to_dict('records')
+        async with driver.session() as session:
+            await write_batches(session, _ROUTE_CYPHER, shared_rows, batch_size)
+        print(f"Merged {len(shared_rows)} flight routes.")
+
+        bins = [bin_df.to_dict('records') for _, bin_df in df.groupby('bin')]
+        await asyncio.gather(*(ingest_bin(bin_rows) for bin_rows in bins))
+
+async def create_kg():
     uri = os.getenv('NEO4J_URI', 'neo4j://localhost:7687')
     username = os.getenv('NEO4J_USERNAME', 'neo4j')
     password = os.getenv('NEO4J_PASSWORD', 'password')
@@ -15,80 +169,31 @@ def create_kg():
     print(f"Username: {username}")
     print(f"Password: {password}")
 
-    driver = GraphDatabase.driver(uri, auth=(username, password))
-
-    csv_file = '../Airline_surveys_sample.csv'
-    df = pd.read_csv(csv_file)
-
-    with driver.session() as session:
-
-        for index, row in df.iterrows():
-            # Passenger
-            record_locator = row['record_locator']
-            loyalty_program_level = row['loyalty_program_level']
-            generation = row['generation']
-
-            # Journey
-            feedback_ID = row['feedback_ID']
-            food_satisfaction_score = int(row['food_satisfaction_score'])
-            arrival_delay_minutes = int(row['arrival_delay_minutes'])
-            actual_flown_miles = int(row['actual_flown_miles'])
-            number_of_legs = int(row['number_of_legs'])
-            passenger_class = row['passenger_class']
-
-            # Flight
-            flight_number = str(row['flight_number']) # Treat as string to be safe or int
-            fleet_type_description = row['fleet_type_description']
-
-            # Airports
-            origin_code = row['origin_station_code']
-            dest_code = row['destination_station_code']
-
-            query = """
-            MERGE (p:Passenger {record_locator: $record_locator})
-            SET p.loyalty_program_level = $loyalty_program_level,
-                p.generation = $generation
-            
-            
-            MERGE (j:Journey {feedback_ID: $feedback_ID})
-            SET j.food_satisfaction_score = $food_satisfaction_score,
-                j.arrival_delay_minutes = $arrival_delay_minutes,
-                j.actual_flown_miles = $actual_flown_miles,
-                j.number_of_legs = $number_of_legs,
-                j.passenger_class = $passenger_class
-
-            MERGE (f:Flight {flight_number: $flight_number, fleet_type_description: $fleet_type_description})
-
-            MERGE (origin:Airport {station_code: $origin_code})
-            MERGE (dest:Airport {station_code: $dest_code})
-
-            MERGE (p)-[:TOOK]->(j)
-            MERGE (j)-[:ON]->(f)
-            MERGE (f)-[:DEPARTS_FROM]->(origin)
-            MERGE (f)-[:ARRIVES_AT]->(dest)
-            """
-
-            session.run(query,
-                        record_locator=record_locator,
-                        loyalty_program_level=loyalty_program_level,
-                        generation=generation,
-                        feedback_ID=feedback_ID,
-                        food_satisfaction_score=food_satisfaction_score,
-                        arrival_delay_minutes=arrival_delay_minutes,
-                        actual_flown_miles=actual_flown_miles,
-                        number_of_legs=number_of_legs,
-                        passenger_class=passenger_class,
-                        flight_number=flight_number,
-                        fleet_type_description=fleet_type_description,
-                        origin_code=origin_code,
-                        dest_code=dest_code
-                        )
-            
-            if index % 100 == 0:
-                print(f"Processed {index} rows...")
-
-    driver.close()
+    driver = AsyncGraphDatabase.driver(
+        uri,
+        auth=(username, password),
+        max_connection_pool_size=int(os.getenv('NEO4J_POOL', 200)),
+        connection_acquisition_timeout=int(os.getenv('NEO4J_ACQ_TIMEOUT', 120)),
+        connection_timeout=30,
+        max_connection_lifetime=3600,
+    )
+
+    async with driver.session() as session:
+        for constraint in _CONSTRAINTS:
+            await (await session.run(constraint)).consume()
+        await (await session.run("CALL db.awaitIndexes()")).consume()
+
+    csv_url = os.getenv('KG_CSV_URL')
+    if csv_url:
+        # The server reads the file itself and commits every 5000 rows
+        print(f"Loading {csv_url} on the server...")
+        async with driver.session() as session:
+            await (await session.run(_LOAD_CSV_CYPHER, csv_url=csv_url)).consume()
+    else:
+        await ingest_csv(driver, '../Airline_surveys_sample.csv')
+
+    await driver.close()
     print("Knowledge Graph created successfully. 🥳")
 
 if __name__ == "__main__":
-    create_kg()
+    asyncio.run(create_kg())
@@ -1,67 +1,106 @@
 import re
-from neo4j import GraphDatabase
+import asyncio
+from functools import lru_cache
+from neo4j import AsyncGraphDatabase
 
-def load_config(config_file):
-    config = {}
+_HEADER_RE = re.compile(r'// \d+\. Query.*')
+_COMMENT_RE = re.compile(r'^[ \t]*//.*(?:\n|$)', re.MULTILINE)
+
+@lru_cache(maxsize=4)
+def _read_config(config_file):
+    # Immutable, so the memoised value cannot be changed by a caller
     with open(config_file, 'r') as f:
-        for line in f:
-            if '=' in line:
-                key, value = line.strip().split('=', 1)
-                config[key] = value
-    return config
+        return tuple(tuple(line.strip().split('=', 1)) for line in f if '=' in line)
+
+def load_config(config_file):
+    """Settings from a KEY=value file, as a fresh dict on every call."""
+    return dict(_read_config(config_file))
 
 def parse_queries(file_path):
     with open(file_path, 'r') as f:
         content = f.read()
     
-    # Split by query headers (e.g., "// 1. Query 1", "// 5. Query")
-    # We use a regex that matches the pattern of the headers
-    parts = re.split(r'// \d+\. Query.*', content)
-    
-    queries = []
-    for part in parts:
-        # Remove comments (lines starting with //) and strip whitespace
-        lines = [line for line in part.splitlines() if not line.strip().startswith('//')]
-        query = '\n'.join(lines).strip()
-        if query:
-            queries.append(query)
-    return queries
-
-def run_queries():
+    # Split by query headers (e.g., "// 1. Query 1", "// 5. Query"), then
+    # drop the remaining comment lines (lines starting with //)
+    parts = _HEADER_RE.split(content)
+    queries = [_COMMENT_RE.sub('', part).strip() for part in parts]
+    return [query for query in queries if query]
+
+async def run_query(driver, semaphore, i, query, previous, finished):
+    """
+    Run one query in its own session and print its output, in query order.
+
+    The query whose turn it is (every earlier query printed, i.e. previous
+    is set) prints its rows as they are read; queries that run ahead buffer
+    theirs until their turn. finished is set once this query has printed.
+    """
+    buffered = []
+
+    def emit(line):
+        if previous is None or previous.is_set():
+            if buffered:
+                print("\n".join(buffered))
+                buffered.clear()
+            print(line)
+        else:
+            buffered.append(line)
+
+    emit(f"--- Running Query {i} ---")
+    emit(f"Query:\n{query}\n")
+    async with semaphore:
+        try:
+            async with driver.session() as session:
+                result = await session.run(query)
+                # Peek at the first record for the header instead of
+                # materialising the whole result up front
+                first = await result.peek()
+                if first is None:
+                    emit("No results found.")
+                else:
+                    # Print header
+                    keys = first.keys()
+                    emit(" | ".join(keys))
+                    emit("-" * (len(keys) * 15))
+
+                    # Print rows
+                    async for record in result:
+                        emit(" | ".join(str(record[key]) for key in keys))
+        except Exception as e:
+            emit(f"Error running query {i}: {e}")
+
+    # Outside the semaphore, so waiting for earlier queries holds no slot
+    if previous is not None:
+        await previous.wait()
+    emit("\n" + "="*30 + "\n")
+    finished.set()
+
+async def run_queries(concurrency=4):
     config = load_config('config.txt')
     uri = config.get('URI', 'neo4j://localhost:7687')
     username = config.get('USERNAME', 'neo4j')
     password = config.get('PASSWORD', 'password')
 
-    driver = GraphDatabase.driver(uri, auth=(username, password))
+    driver = AsyncGraphDatabase.driver(
+        uri,
+        auth=(username, password),
+        max_connection_pool_size=int(config.get('NEO4J_POOL', 200)),
+        connection_acquisition_timeout=int(config.get('NEO4J_ACQ_TIMEOUT', 120)),
+        connection_timeout=30,
+        max_connection_lifetime=3600,
+    )
 
     queries = parse_queries('queries.txt')
     
     print(f"Found {len(queries)} queries to execute.\n")
 
-    with driver.session() as session:
-        for i, query in enumerate(queries, 1):
-            print(f"--- Running Query {i} ---")
-            print(f"Query:\n{query}\n")
-            try:
-                result = session.run(query)
-                records = list(result)
-                if not records:
-                    print("No results found.")
-                else:
-                    # Print header
-                    keys = records[0].keys()
-                    print(" | ".join(keys))
-                    print("-" * (len(keys) * 15))
-                    
-                    # Print rows
-                    for record in records:
-                        print(" | ".join(str(record[key]) for key in keys))
-            except Exception as e:
-                print(f"Error running query {i}: {e}")
-            print("\n" + "="*30 + "\n")
+    # Queries run concurrently but are printed in their original order
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = [asyncio.Event() for _ in queries]
+    await asyncio.gather(*(run_query(driver, semaphore, i, query,
+                                     finished[i - 2] if i > 1 else None, finished[i - 1])
+                           for i, query in enumerate(queries, 1)))
 
-    driver.close()
+    await driver.close()
 
 if __name__ == "__main__":
-    run_queries()
+    asyncio.run(run_queries())
@@ -4,8 +4,27 @@ Combines baseline Cypher queries and embedding-based retrieval
 to generate grounded LLM responses.
 """
 
-from .llm_handler import LLMHandler
-from .model_comparison import ModelComparator
-from .evaluation import EvaluationMetrics
+__all__ = ['LLMHandler', 'ModelComparator', 'EvaluationMetrics', 'SemanticCache']
 
-__all__ = ['LLMHandler', 'ModelComparator', 'EvaluationMetrics']
\ No newline at end of file
+# Submodule for each public name. They are imported on first access
+# (PEP 562) so that e.g. using EvaluationMetrics does not pull in the
+# embedding model and Neo4j driver that LLMHandler needs.
+_LAZY_IMPORTS = {
+    'LLMHandler': '.llm_handler',
+    'ModelComparator': '.model_comparison',
+    'EvaluationMetrics': '.evaluation',
+    'SemanticCache': '.semantic_cache',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
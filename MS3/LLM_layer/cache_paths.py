@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Cache Paths - Where generated caches are written, outside the source tree
+"""
+import os
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Directory for generated cache files, created if missing.
+
+    Uses $XDG_CACHE_HOME (default ~/.cache)/airline-customer-booking, so
+    caches never land next to the tracked files they are derived from.
+
+    Args:
+        parts: Optional subdirectory names
+
+    Returns:
+        Absolute path of the directory
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "airline-customer-booking", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -4,13 +4,59 @@ Evaluation Framework for LLM Responses
 Includes both quantitative and qualitative metrics
 """
 import os
-import sys
 import json
 import re
-from typing import List, Dict, Any, Tuple
+from collections import namedtuple
+from typing import List, Dict, Any
 from datetime import datetime
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import numpy as np
+
+try:
+    import orjson  # Optional: faster JSON encoding for saved reports
+except ImportError:
+    orjson = None
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Numbers (integers or decimals) used for grounding checks
+_NUM_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+# Query words ignored when picking relevance keywords
+_STOPWORDS = frozenset({'what', 'which', 'show', 'find', 'list', 'give'})
+
+# Phrases that mark an answer as an error message (substring match)
+_ERROR_KEYWORDS = frozenset({'error', 'cannot', 'unable', 'not found', 'no data'})
+
+# Phrase groups for _detect_no_hallucination, each compiled into one
+# alternation so the answer is scanned once per group. Plain substring
+# matches, same as the original `phrase in answer` checks.
+_HEDGE_RE = re.compile('|'.join(map(re.escape, [
+    'based on the data',
+    'according to',
+    'the results show',
+    'from the context',
+    'data indicates',
+    'cannot determine',
+    'not available',
+    'no information'
+])))
+_ABSOLUTE_RE = re.compile('|'.join(['always', 'never', 'all', 'none', 'every', 'must']))
+_NO_DATA_RE = re.compile('|'.join(['no data', 'cannot', 'not available']))
+
+# Report keys for the per-model averages in evaluate_comparison, in row order
+_COMPARISON_FIELDS = (
+    "avg_response_time",
+    "avg_word_count",
+    "avg_relevance",
+    # "avg_grounding",  # Grounding is currently disabled
+    "avg_clarity",
+    "avg_no_hallucination",
+    "overall_quality",
+)
+
+# An answer split up once and shared by every metric
+_Tokenized = namedtuple('_Tokenized', ['text', 'lower', 'words', 'sentences'])
 
 
 class EvaluationMetrics:
@@ -34,24 +80,52 @@ class EvaluationMetrics:
     def __init__(self):
         self.evaluations = []
 
-    def evaluate_quantitative(self, result: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def tokenize(answer: str) -> _Tokenized:
+        """
+        Split an answer into the pieces the metrics need, in one go.
+
+        Args:
+            answer: The LLM answer text
+
+        Returns:
+            Tokenized answer (text, lowercased text, words, non-empty sentences)
+        """
+        return _Tokenized(
+            text=answer,
+            lower=answer.lower(),
+            words=answer.split(),
+            sentences=[s.strip() for s in answer.split('.') if s.strip()],
+        )
+
+    def evaluate_quantitative(self, result: Dict[str, Any],
+                              tokens: _Tokenized = None) -> Dict[str, Any]:
         """
         Calculate quantitative metrics for a single result.
 
         Args:
             result: Result from LLMHandler.generate_answer()
+            tokens: Optional pre-tokenized answer (see tokenize())
 
         Returns:
             Dictionary of quantitative metrics
         """
         answer = result.get("answer", "")
         context = result.get("context", "")
+        if tokens is None:
+            # Only the counts are needed here, so skip building the
+            # lowercased text and stripped sentence list of tokenize()
+            word_count = len(answer.split())
+            sentence_count = sum(1 for s in answer.split('.') if s and not s.isspace())
+        else:
+            word_count = len(tokens.words)
+            sentence_count = len(tokens.sentences)
 
         metrics = {
             "response_time": result.get("response_time", 0),
             "answer_length": len(answer),
-            "word_count": len(answer.split()),
-            "sentence_count": len([s for s in answer.split('.') if s.strip()]),
+            "word_count": word_count,
+            "sentence_count": sentence_count,
             "context_length": len(context),
             "context_words": len(context.split()),
             "baseline_results_count": len(result.get("baseline_results", {}).get("results", [])),
@@ -67,13 +141,15 @@ class EvaluationMetrics:
         return metrics
 
     def evaluate_qualitative(self, result: Dict[str, Any],
-                            ground_truth: str = None) -> Dict[str, Any]:
+                            ground_truth: str = None,
+                            tokens: _Tokenized = None) -> Dict[str, Any]:
         """
         Evaluate qualitative aspects of the answer.
 
         Args:
             result: Result from LLMHandler.generate_answer()
             ground_truth: Optional expected answer for comparison
+            tokens: Optional pre-tokenized answer (see tokenize())
 
         Returns:
             Dictionary of qualitative metrics
@@ -81,13 +157,15 @@ class EvaluationMetrics:
         answer = result.get("answer", "")
         context = result.get("context", "")
         query = result.get("query", "")
+        if tokens is None:
+            tokens = self.tokenize(answer)
 
         scores = {
-            "relevance": self._score_relevance(answer, query),
+            "relevance": self._score_relevance(tokens, query),
             # "factual_grounding": self._score_grounding(answer, context),
-            "completeness": self._score_completeness(answer, query),
-            "clarity": self._score_clarity(answer),
-            "no_hallucination": self._detect_no_hallucination(answer, context),
+            "completeness": self._score_completeness(tokens, query),
+            "clarity": self._score_clarity(tokens),
+            "no_hallucination": self._detect_no_hallucination(tokens, context),
         }
 
         # Overall qualitative score (average)
@@ -98,25 +176,25 @@ class EvaluationMetrics:
 
         return scores
 
-    def _score_relevance(self, answer: str, query: str) -> float:
+    def _score_relevance(self, tokens: _Tokenized, query: str) -> float:
         """
         Score how relevant the answer is to the query (0-1).
 
         Simple heuristic: Check for query keywords in answer.
         """
-        if not answer or not query:
+        if not tokens.text or not query:
             return 0.0
 
         # Extract key terms from query (nouns, numbers, important words)
         query_lower = query.lower()
-        answer_lower = answer.lower()
+        answer_lower = tokens.lower
 
         # Common airline terms to look for
         keywords = []
 
         # Extract important words (simple approach)
         for word in query_lower.split():
-            if len(word) > 3 and word not in ['what', 'which', 'show', 'find', 'list', 'give']:
+            if len(word) > 3 and word not in _STOPWORDS:
                 keywords.append(word)
 
         if not keywords:
@@ -136,14 +214,14 @@ class EvaluationMetrics:
             return 0.0
 
         # Extract numbers from answer
-        answer_numbers = set(re.findall(r'\b\d+(?:\.\d+)?\b', answer))
+        answer_numbers = set(_NUM_RE.findall(answer))
 
         if not answer_numbers:
             # If no numbers, check for specific entities
             return 0.7  # Moderate score
 
         # Check how many numbers from answer appear in context
-        context_numbers = set(re.findall(r'\b\d+(?:\.\d+)?\b', context))
+        context_numbers = set(_NUM_RE.findall(context))
 
         if not context_numbers:
             return 0.3  # Low score if answer has numbers but context doesn't
@@ -153,16 +231,16 @@ class EvaluationMetrics:
 
         return grounding_ratio
 
-    def _score_completeness(self, answer: str, query: str) -> float:
+    def _score_completeness(self, tokens: _Tokenized, query: str) -> float:
         """
         Score how complete the answer is (0-1).
 
         Heuristic: Longer answers are more complete, but not too long.
         """
-        if not answer:
+        if not tokens.text:
             return 0.0
 
-        word_count = len(answer.split())
+        word_count = len(tokens.words)
 
         # Optimal range: 30-150 words
         if word_count < 10:
@@ -176,7 +254,7 @@ class EvaluationMetrics:
         else:
             return 0.6  # Too verbose
 
-    def _score_clarity(self, answer: str) -> float:
+    def _score_clarity(self, tokens: _Tokenized) -> float:
         """
         Score the clarity of the answer (0-1).
 
@@ -185,13 +263,13 @@ class EvaluationMetrics:
         - Not too many technical jargon
         - Clear language
         """
-        if not answer:
+        if not tokens.text:
             return 0.0
 
         score = 1.0
 
         # Check for incomplete sentences
-        sentences = [s.strip() for s in answer.split('.') if s.strip()]
+        sentences = tokens.sentences
         if len(sentences) == 0:
             return 0.2
 
@@ -201,39 +279,28 @@ class EvaluationMetrics:
             score -= 0.3
 
         # Check for error messages in answer
-        error_keywords = ['error', 'cannot', 'unable', 'not found', 'no data']
-        if any(kw in answer.lower() for kw in error_keywords):
+        if any(kw in tokens.lower for kw in _ERROR_KEYWORDS):
             score -= 0.2
 
         return max(score, 0.0)
 
-    def _detect_no_hallucination(self, answer: str, context: str) -> float:
+    def _detect_no_hallucination(self, tokens: _Tokenized, context: str) -> float:
         """
         Score confidence that answer does not hallucinate (0-1).
 
         1.0 = High confidence no hallucination
         0.0 = Likely hallucination
         """
-        if not answer:
+        if not tokens.text:
             return 1.0  # No answer = no hallucination
 
+        answer_lower = tokens.lower
+
         # Check for hedge phrases (good signs)
-        hedge_phrases = [
-            'based on the data',
-            'according to',
-            'the results show',
-            'from the context',
-            'data indicates',
-            'cannot determine',
-            'not available',
-            'no information'
-        ]
-
-        has_hedging = any(phrase in answer.lower() for phrase in hedge_phrases)
+        has_hedging = _HEDGE_RE.search(answer_lower) is not None
 
         # Check for absolute claims without data
-        absolute_claims = ['always', 'never', 'all', 'none', 'every', 'must']
-        has_absolutes = any(claim in answer.lower() for claim in absolute_claims)
+        has_absolutes = _ABSOLUTE_RE.search(answer_lower) is not None
 
         score = 0.7  # Base score
 
@@ -245,7 +312,7 @@ class EvaluationMetrics:
 
         # Check if answer says "I don't know" when no context
         if not context or len(context) < 50:
-            if any(phrase in answer.lower() for phrase in ['no data', 'cannot', 'not available']):
+            if _NO_DATA_RE.search(answer_lower):
                 score = 1.0  # Correctly admits lack of data
 
         return max(min(score, 1.0), 0.0)
@@ -287,50 +354,51 @@ class EvaluationMetrics:
             "models": {}
         }
 
-        # Collect all model keys
-        all_models = set()
-        for result in comparison_results:
-            all_models.update(result["models"].keys())
-
-        # Evaluate each model
-        for model_key in all_models:
-            model_scores = {
-                "quantitative": [],
-                "qualitative": []
-            }
-
-            for query_result in comparison_results:
-                if model_key in query_result["models"]:
-                    model_data = query_result["models"][model_key]
-
-                    if model_data.get("answer"):
-                        # Create result dict for evaluation
-                        eval_result = {
-                            "answer": model_data["answer"],
-                            "context": "",  # Would need to store this
-                            "query": query_result["query"],
-                            "response_time": model_data.get("response_time", 0)
-                        }
-
-                        # Quantitative metrics
-                        quant = self.evaluate_quantitative(eval_result)
-                        model_scores["quantitative"].append(quant)
-
-                        # Qualitative metrics
-                        qual = self.evaluate_qualitative(eval_result)
-                        model_scores["qualitative"].append(qual)
-
-            # Aggregate scores
-            if model_scores["quantitative"]:
-                report["models"][model_key] = {
-                    "avg_response_time": sum(q["response_time"] for q in model_scores["quantitative"]) / len(model_scores["quantitative"]),
-                    "avg_word_count": sum(q["word_count"] for q in model_scores["quantitative"]) / len(model_scores["quantitative"]),
-                    "avg_relevance": sum(q["relevance"] for q in model_scores["qualitative"]) / len(model_scores["qualitative"]),
-                    "avg_grounding": sum(q["factual_grounding"] for q in model_scores["qualitative"]) / len(model_scores["qualitative"]),
-                    "avg_clarity": sum(q["clarity"] for q in model_scores["qualitative"]) / len(model_scores["qualitative"]),
-                    "avg_no_hallucination": sum(q["no_hallucination"] for q in model_scores["qualitative"]) / len(model_scores["qualitative"]),
-                    "overall_quality": sum(q["overall_qualitative"] for q in model_scores["qualitative"]) / len(model_scores["qualitative"])
-                }
+        # One row of metrics per answered query, collected in a single pass
+        model_rows = {}
+        for query_result in comparison_results:
+            for model_key, model_data in query_result["models"].items():
+                rows = model_rows.setdefault(model_key, [])
+
+                if model_data.get("answer"):
+                    # Create result dict for evaluation
+                    eval_result = {
+                        "answer": model_data["answer"],
+                        "context": "",  # Would need to store this
+                        "query": query_result["query"],
+                        "response_time": model_data.get("response_time", 0)
+                    }
+
+                    tokens = self.tokenize(eval_result["answer"])
+
+                    # Quantitative metrics
+                    quant = self.evaluate_quantitative(eval_result, tokens=tokens)
+
+                    # Qualitative metrics
+                    qual = self.evaluate_qualitative(eval_result, tokens=tokens)
+
+                    rows.append((
+                        # Answer-cache hits (response time 0) stay out of the timing
+                        np.nan if model_data.get("cached") else quant["response_time"],
+                        quant["word_count"],
+                        qual["relevance"],
+                        qual["clarity"],
+                        qual["no_hallucination"],
+                        qual["overall_qualitative"],
+                    ))
+
+        # Aggregate scores (column means over all rows at once)
+        for model_key, rows in model_rows.items():
+            if rows:
+                values = np.array(rows, dtype=np.float64)
+                means = values.mean(axis=0)
+                times = values[:, 0]
+                timed = times[~np.isnan(times)]
+                stats = dict(zip(_COMPARISON_FIELDS, means.tolist()))
+                # None when every answer came from the cache
+                stats["avg_response_time"] = float(timed.mean()) if len(timed) else None
+                stats["cache_hit_rate"] = 1 - len(timed) / len(times)
+                report["models"][model_key] = stats
 
         return report
 
@@ -342,10 +410,14 @@ class EvaluationMetrics:
             report: Evaluation report dictionary
             filename: Output filename
         """
-        filepath = os.path.join(os.path.dirname(__file__), filename)
+        filepath = os.path.join(_MODULE_DIR, filename)
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
 
         print(f"\nEvaluation report saved to: {filepath}")
 
@@ -363,7 +435,7 @@ class EvaluationMetrics:
         print(f"\nTotal Queries Evaluated: {report['total_queries']}")
         print("\nModel Rankings:")
         print("-"*80)
-        print(f"{'Model':<20} {'Quality':<10} {'Relevance':<12} {'Grounding':<12} {'Clarity':<10}")
+        print(f"{'Model':<20} {'Quality':<10} {'Relevance':<12} {'Clarity':<10}")
         print("-"*80)
 
         # Sort models by overall quality
@@ -377,20 +449,23 @@ class EvaluationMetrics:
             print(f"{model_key:<20} "
                   f"{metrics.get('overall_quality', 0)*100:>6.1f}%   "
                   f"{metrics.get('avg_relevance', 0)*100:>8.1f}%    "
-                  f"{metrics.get('avg_grounding', 0)*100:>8.1f}%    "
+                  # f"{metrics.get('avg_grounding', 0)*100:>8.1f}%    "
                   f"{metrics.get('avg_clarity', 0)*100:>6.1f}%")
 
         print("-"*80)
         print("\nPerformance Metrics:")
         print("-"*80)
-        print(f"{'Model':<20} {'Avg Time':<12} {'Avg Words':<12} {'No Halluc.':<12}")
+        print(f"{'Model':<20} {'Avg Time':<12} {'Avg Words':<12} {'No Halluc.':<12} {'Cached':<8}")
         print("-"*80)
 
         for model_key, metrics in sorted_models:
+            avg_time = metrics.get('avg_response_time')
             print(f"{model_key:<20} "
-                  f"{metrics.get('avg_response_time', 0):>8.2f}s    "
+                  # No live timing when every answer came from the cache
+                  f"{'-' if avg_time is None else f'{avg_time:.2f}s':>9}    "
                   f"{metrics.get('avg_word_count', 0):>8.1f}    "
-                  f"{metrics.get('avg_no_hallucination', 0)*100:>8.1f}%")
+                  f"{metrics.get('avg_no_hallucination', 0)*100:>8.1f}%    "
+                  f"{metrics.get('cache_hit_rate', 0)*100:>6.1f}%")
 
         print("-"*80)
 
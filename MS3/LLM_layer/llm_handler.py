@@ -5,8 +5,32 @@ LLM Handler - Combines baseline and embedding results with structured prompts
 import os
 import sys
 import json
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+
+# CPU threads for the embedding model. PyTorch defaults to every logical core,
+# which oversubscribes transformer inference; OpenMP/MKL read their settings
+# when the libraries load, so these must be set before numpy/torch are imported.
+SBERT_THREADS = int(os.environ.get("SBERT_THREADS", min(8, os.cpu_count() or 4)))
+os.environ.setdefault("OMP_NUM_THREADS", str(SBERT_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(SBERT_THREADS))
+
+import numpy as np
+from neo4j.graph import Node, Relationship
+
+try:
+    from neo4j.vector import Vector  # neo4j driver 6+: packs vectors as raw bytes
+except ImportError:
+    Vector = None
+
+try:
+    import orjson  # Optional: faster JSON encoding of the retrieved rows
+except ImportError:
+    orjson = None
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -15,6 +39,197 @@ from config.openai_client import get_answer, get_openai_gpt4_answer
 from config.neo4j_client import driver as default_driver
 from MS3.base_retrieve import Neo4jRetriever
 from MS3.preprocessing import QueryPreprocessor
+from MS3.LLM_layer.semantic_cache import SemanticCache
+
+# Where the ONNX exports of the embedding models are kept
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_models")
+ONNX_O3_FILE = "onnx/model_O3.onnx"
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Static prompt scaffolding; only the question and context vary per call
+DEFAULT_PERSONA = """You are a Senior Airline Business Intelligence Analyst presenting insights to airline executives and operations managers.
+Your role is to transform flight data, passenger feedback, and operational metrics into actionable business insights that drive strategic decisions.
+
+Your expertise includes:
+- Revenue optimization and passenger yield analysis
+- Route performance and network planning
+- Customer satisfaction drivers and loyalty program effectiveness
+- Operational efficiency, on-time performance, and delay root causes
+- Fleet utilization and aircraft performance comparisons
+- Competitive positioning and market share analysis
+
+Communication style:
+- Present findings as strategic business insights, not raw data
+- Highlight trends, patterns, and anomalies that impact the bottom line
+- Recommend specific actions based on the data
+- Quantify business impact when possible (e.g., "This affects X% of passengers")
+- Use airline industry terminology appropriately"""
+
+TASK_TEMPLATE = """Analyze the provided data and deliver business insights for airline management.
+
+CRITICAL RULES:
+- NEVER mention technical terms like "intents", "entities", "embeddings", "semantic search", "vector scores", or "knowledge graph"
+- NEVER display raw data structures, JSON, scores, or internal system details
+- NEVER say "based on the data provided" or reference how you retrieved information
+- DO present insights as if you analyzed this data yourself
+
+Question: {user_query}
+
+Your response MUST:
+1. Lead with the key business insight or finding
+2. Support with specific data points woven naturally into the narrative
+3. Explain the business implications (why this matters to the airline)
+4. Provide actionable recommendations when relevant
+5. Identify any concerning trends or opportunities for improvement
+
+Format your response as a professional business insight brief - concise, data-driven, and focused on what matters for airline operations and profitability."""
+
+PROMPT_TEMPLATE = """### PERSONA
+{persona}
+
+### CONTEXT (Knowledge Graph Data)
+{context}
+
+### TASK
+{task}
+
+### ANSWER
+"""
+
+# The default persona is by far the most common, so its prompt is pre-rendered
+# around the two slots and assembled with a single join per call
+_DEFAULT_PROMPT_PREFIX, _PROMPT_SUFFIX = PROMPT_TEMPLATE.split("{context}")
+_DEFAULT_PROMPT_PREFIX = _DEFAULT_PROMPT_PREFIX.format_map({"persona": DEFAULT_PERSONA})
+_PROMPT_TASK_HEAD, _PROMPT_TASK_TAIL = _PROMPT_SUFFIX.split("{task}")
+_TASK_HEAD, _TASK_TAIL = TASK_TEMPLATE.split("{user_query}")
+_PROMPT_QUERY_HEAD = _PROMPT_TASK_HEAD + _TASK_HEAD
+_PROMPT_QUERY_TAIL = _TASK_TAIL + _PROMPT_TASK_TAIL
+
+# Schema and instructions for automated Cypher generation; only the question varies
+CYPHER_SCHEMA = """
+        Nodes & Properties:
+        - Passenger: generation, loyalty_program_level, record_locator
+        - Journey: arrival_delay_minutes, food_satisfaction_score, passenger_class, feedback_ID, actual_flown_miles
+        - Flight: flight_number, fleet_type_description
+        - Airport: station_code
+
+        Relationships:
+        - (:Passenger)-[:TOOK]->(:Journey)
+        - (:Journey)-[:ON]->(:Flight)
+        - (:Flight)-[:DEPARTS_FROM]->(:Airport)
+        - (:Flight)-[:ARRIVES_AT]->(:Airport)
+        """
+
+AUTO_CYPHER_PROMPT_TEMPLATE = """You are a Neo4j Cypher expert. 
+        Generate a READ-ONLY Cypher query for the following user question based on the schema below.
+        
+        SCHEMA:
+        {schema}
+
+        RULES:
+        1. Return ONLY the Cypher query. No markdown, no explanations.
+        2. Use Case-Insensitive matching for strings if unsure (e.g. toLower(n.prop) CONTAINS 'value')
+        3. LIMIT results to 20 unless specified otherwise.
+        4. Do NOT use procedures like APOC.
+        5. For aggregations (averages, counts), return clear aliases.
+
+        User Question: {user_query}
+        """
+
+_AUTO_CYPHER_PROMPT = AUTO_CYPHER_PROMPT_TEMPLATE.replace("{schema}", CYPHER_SCHEMA)
+
+
+# Model name fragment -> Neo4j vector index (see embedding_test/create_indices.py)
+_MODEL_INDEX_MAP = (
+    ("minilm", "minilm_vec_index"),
+    ("mpnet", "mpnet_vec_index"),
+    ("bge-m3", "bgem3_vec_index"),
+)
+
+
+@lru_cache(maxsize=None)
+def _index_for_model(model_name: str) -> str:
+    """Map embedding model name to Neo4j index name (memoized)"""
+    name = model_name.lower()
+    return next((index for key, index in _MODEL_INDEX_MAP if key in name),
+                "bgem3_vec_index")  # Default to BGE-M3
+
+
+@lru_cache(maxsize=None)
+def _import_torch():
+    """
+    Import torch on first use (it and sentence-transformers take seconds to
+    import, which code that never embeds should not pay) and apply SBERT_THREADS.
+    """
+    import torch
+    torch.set_num_threads(SBERT_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set (or parallel work already started) in this process
+    return torch
+
+
+# Serializes model loads so concurrent handlers never load the same model twice
+_MODEL_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _get_st_model(model_name: str, backend: str = "torch"):
+    """
+    Load the embedding model on CPU, once per process (handlers share it).
+
+    "torch-bf16" keeps the weights in bfloat16, halving the memory traffic
+    of each forward pass (single-query encoding on CPU is bandwidth bound).
+    "torch-int8" applies torch dynamic quantization to every nn.Linear
+    (int8 weights, activations quantized on the fly).
+    "onnx" runs the model through ONNX Runtime with O3 graph optimizations
+    (fused LayerNorm/GELU/attention), and "onnx-int8" additionally uses
+    dynamically quantized int8 weights; both are several times faster than
+    FP32 torch on CPU. The exports are written to ONNX_MODEL_DIR the first
+    time and reused afterwards.
+
+    Args:
+        model_name: Sentence-transformers model name
+        backend: "torch", "torch-bf16", "torch-int8", "onnx" or "onnx-int8"
+
+    Returns:
+        SentenceTransformer instance
+    """
+    torch = _import_torch()
+    from sentence_transformers import SentenceTransformer
+
+    # Load embedding model for semantic search on CPU to avoid CUDA OOM errors
+    print(f"Loading embedding model: {model_name} (on CPU, {backend})")
+    if backend == "torch":
+        return SentenceTransformer(model_name, device='cpu').eval()
+    if backend == "torch-bf16":
+        # encode() upcasts the pooled output, so callers still get float32
+        return SentenceTransformer(model_name, device='cpu').to(torch.bfloat16).eval()
+    if backend == "torch-int8":
+        model = SentenceTransformer(model_name, device='cpu').eval()
+        transformer = model[0]
+        transformer.auto_model = torch.quantization.quantize_dynamic(
+            transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model, export_optimized_onnx_model
+
+    onnx_file = ONNX_INT8_FILE if backend == "onnx-int8" else ONNX_O3_FILE
+    local_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+    if not os.path.exists(os.path.join(local_dir, onnx_file)):
+        print(f"Exporting {backend} model to {local_dir} (one-time)")
+        model = SentenceTransformer(model_name, device='cpu', backend="onnx")
+        model.save_pretrained(local_dir)
+        if backend == "onnx-int8":
+            export_dynamic_quantized_onnx_model(model, "avx512_vnni", local_dir)
+        else:
+            export_optimized_onnx_model(model, "O3", local_dir)
+
+    return SentenceTransformer(local_dir, device='cpu', backend="onnx",
+                               model_kwargs={"file_name": onnx_file})
 
 
 class LLMHandler:
@@ -27,7 +242,37 @@ class LLMHandler:
     3. Supports multiple LLM models for comparison
     """
 
-    def __init__(self, retriever=None, driver=None, embedding_model="BAAI/bge-m3"):
+    # Max (intent, entities) pairs remembered per handler (keyed by query text)
+    PREPROCESS_CACHE_SIZE = 2048
+
+    # Max query embeddings remembered per handler (keyed by normalized text)
+    EMBEDDING_CACHE_SIZE = 4096
+
+    # Similarity above which a query reuses an earlier query's vector search rows
+    RECORD_CACHE_THRESHOLD = 0.98
+
+    # Vector search candidates fetched per requested result (dedup headroom)
+    CANDIDATE_FACTOR = 4
+
+    # Most rows per result set placed in the LLM context
+    CONTEXT_MAX_ROWS = 20
+
+    # Micro-batching of concurrent async encode requests
+    ENCODE_MAX_BATCH = 16
+    ENCODE_MAX_WAIT = 0.01  # seconds
+
+    # Intents whose Cypher templates answer the question outright (lookups
+    # and aggregates); semantic search adds nothing once they return rows
+    STRUCTURED_INTENTS = frozenset({
+        "lookup_details", "search_network", "analyze_passengers", "analyze_journeys",
+        "analyze_loyalty", "analyze_experience", "compare_routes",
+    })
+
+    def __init__(self, retriever=None, driver=None, embedding_model="BAAI/bge-m3",
+                 semantic_cache: bool = False, cache_threshold: float = 0.95, cache_ttl: Optional[float] = None,
+                 embedding_backend: str = "torch", torch_num_threads: Optional[int] = None,
+                 skip_embeddings_on_exact_hit: bool = False, pretty_context: bool = False,
+                 warmup: bool = False):
         """
         Initialize the LLM Handler.
 
@@ -35,26 +280,172 @@ class LLMHandler:
             retriever: Neo4jRetriever instance
             driver: Neo4j driver instance
             embedding_model: Name of the embedding model to use
+            semantic_cache: Reuse answers for near-identical queries. Off by
+                default: queries that differ only in an entity ("flights from
+                JFK" / "from LAX") can be this similar, and would get each
+                other's answers. Enabling it also embeds every query.
+            cache_threshold: Cosine similarity needed for a cache hit
+            cache_ttl: Seconds a cached answer stays valid (None: until evicted);
+                set it when the graph data changes while the handler runs
+            embedding_backend: "torch" (FP32), "torch-bf16" (bfloat16 weights, for
+                CPUs with AVX-512 BF16/AMX), "torch-int8" (dynamically quantized
+                Linear layers), "onnx" (ONNX Runtime, O3 graph
+                optimizations) or "onnx-int8" (ONNX Runtime with dynamic int8
+                quantization); ONNX models are exported on first use
+            torch_num_threads: Intra-op threads for torch. When running N
+                worker processes, use physical_cores // N to avoid oversubscription
+            skip_embeddings_on_exact_hit: Run baseline before semantic search and
+                skip the search when baseline answered a STRUCTURED_INTENTS
+                query (saves the vector search, but the two no longer overlap)
+            pretty_context: Indent the JSON rows in the context (for debugging;
+                compact JSON is faster and costs fewer prompt tokens)
+            warmup: Load the embedding model and warm Neo4j now (see warmup())
+                instead of on the first query
         """
-        self.retriever = retriever if retriever else Neo4jRetriever(driver if driver else default_driver)
+        self.driver = driver or default_driver
+        self.retriever = retriever or Neo4jRetriever(self.driver)
         self.preprocessor = QueryPreprocessor(self.retriever)
-        self.driver = driver if driver else default_driver
 
-        # Load embedding model for semantic search on CPU to avoid CUDA OOM errors
-        print(f"Loading embedding model: {embedding_model} (on CPU)")
-        self.embedding_model = SentenceTransformer(embedding_model, device='cpu')
+        if torch_num_threads:
+            torch = _import_torch()
+            torch.set_num_threads(torch_num_threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Can only be set once per process, before any parallel work
+
+        # The embedding model is loaded on first use (see embedding_model), so
+        # baseline-only handlers never pay for it
+        self.embedding_model_name = embedding_model
+        self.embedding_backend = embedding_backend
+        self._embedding_model = None
         self.embedding_index = self._get_index_for_model(embedding_model)
 
+        # Vector search Cypher, built once. The index name has to be a literal
+        # in the CALL, so it is templated here and only $k_cand/$vec vary per call.
+        # Only the fields used downstream are returned, and there is no
+        # ORDER BY: queryNodes already yields nodes by descending score.
+        # $k_cand over-fetches candidates; dedup and the top_k cut happen in
+        # get_embedding_results.
+        self._embed_cypher = f"""
+        CALL db.index.vector.queryNodes('{self.embedding_index}', $k_cand, $vec)
+        YIELD node, score
+
+        MATCH (j:Journey)-[:HAS_VECTOR]->(node)
+        MATCH (p:Passenger)-[:TOOK]->(j)
+        MATCH (j)-[:ON]->(f:Flight)
+        MATCH (f)-[:DEPARTS_FROM]->(origin:Airport)
+        MATCH (f)-[:ARRIVES_AT]->(dest:Airport)
+
+        RETURN
+            score,
+            node.text AS semantic_text,
+            j.feedback_ID AS feedback_id,
+            j.arrival_delay_minutes AS delay,
+            j.food_satisfaction_score AS food_score,
+            p.generation AS generation,
+            p.loyalty_program_level AS loyalty,
+            f.flight_number AS flight_number,
+            f.fleet_type_description AS aircraft,
+            origin.station_code AS origin,
+            dest.station_code AS destination
+        """
+
+        # Answer caches, one per (model, temperature, retrieval settings) so a
+        # hit never returns another model's answer
+        self.semantic_cache = semantic_cache
+        self.skip_embeddings_on_exact_hit = skip_embeddings_on_exact_hit
+        self.pretty_context = pretty_context
+
+        # Send query vectors as Bolt VECTOR values (packed float32 bytes)
+        # instead of lists of floats; needs driver 6+ and a server with
+        # native vector support
+        self.native_vectors = Vector is not None and \
+            os.getenv("NEO4J_NATIVE_VECTORS", "").lower() in ("1", "true")
+        self.cache_threshold = cache_threshold
+        self.cache_ttl = cache_ttl
+        self._answer_caches = {}
+
+        # LRU of query -> (intent, entities); both come from LLM calls and
+        # identical queries (retries, reloads) repeat often
+        self._preprocess_cache = OrderedDict()
+        self._preprocess_lock = threading.Lock()
+
+        # LRU of normalized query text -> embedding, and near-duplicate
+        # query embedding -> vector search rows (one cache per top_k)
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self._record_caches = {}
+
+        # Long-lived Neo4j sessions, one per thread (sessions are not thread safe)
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+        # Runs the independent retrieval paths of generate_answer side by side
+        self._retrieval_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="retrieval")
+
+        # (event loop, queue, batcher task) for async encodes, created on first use
+        self._encode_queue = None
+
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """
+        Pay the cold-start costs up front: load the embedding model and run a
+        first forward pass (torch allocates its workspaces), open a Bolt
+        connection, and touch the vector index so it is loaded. Failures are
+        reported but never raised.
+        """
+        try:
+            embedding = self._encode_cached("warmup")
+            with self.driver.session() as session:
+                session.run("RETURN 1").consume()
+                session.run(self._embed_cypher, k_cand=1, vec=self._bolt_vector(embedding)).consume()
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
+
+    @property
+    def embedding_model(self):
+        """The embedding model, loaded on first access (the first embed call pays the load)"""
+        if self._embedding_model is None:
+            with _MODEL_LOCK:
+                self._embedding_model = _get_st_model(self.embedding_model_name, self.embedding_backend)
+        return self._embedding_model
+
+    def _get_session(self):
+        """Return this thread's Neo4j session, opening it on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.driver.session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """
+        Release the handler's resources: close its Neo4j sessions (the driver
+        stays open), shut down its retrieval thread pool and cancel its
+        async encode batcher. The handler cannot run retrievals afterwards.
+        """
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+        self._retrieval_pool.shutdown(wait=False)
+
+        if self._encode_queue is not None:
+            loop, _, batcher = self._encode_queue
+            self._encode_queue = None
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(batcher.cancel)
+
     def _get_index_for_model(self, model_name: str) -> str:
         """Map embedding model name to Neo4j index name"""
-        if "minilm" in model_name.lower():
-            return "minilm_vec_index"
-        elif "mpnet" in model_name.lower():
-            return "mpnet_vec_index"
-        elif "bge-m3" in model_name.lower():
-            return "bgem3_vec_index"
-        else:
-            return "bgem3_vec_index"  # Default to BGE-M3
+        return _index_for_model(model_name)
 
     def get_baseline_results(self, user_query: str) -> Dict[str, Any]:
         """
@@ -66,11 +457,7 @@ class LLMHandler:
         Returns:
             Dictionary containing intent, entities, and results
         """
-        # Classify intent
-        intent = self.preprocessor.classify_intent(user_query)
-
-        # Extract entities
-        entities = self.preprocessor.extract_entities(user_query, intent)
+        intent, entities = self._preprocess(user_query)
 
         # Run query
         results, cypher_query = self.retriever.run_query(intent, entities)
@@ -84,97 +471,168 @@ class LLMHandler:
             "generated_cypher": cypher_query
         }
 
-    def get_embedding_results(self, user_query: str, top_k: int = 5) -> Dict[str, Any]:
+    def _preprocess(self, user_query: str):
+        """
+        Classify intent and extract entities, reusing earlier results for the
+        same query (whitespace-normalized).
+
+        Returns:
+            Tuple of (intent, entities); entities is a fresh dict each call
+        """
+        key = " ".join(user_query.split())
+        with self._preprocess_lock:
+            hit = self._preprocess_cache.get(key)
+            if hit is not None:
+                self._preprocess_cache.move_to_end(key)
+        if hit is not None:
+            return hit[0], dict(hit[1])
+
+        # Classify intent
+        intent = self.preprocessor.classify_intent(user_query)
+
+        # Extract entities
+        entities = self.preprocessor.extract_entities(user_query, intent)
+
+        with self._preprocess_lock:
+            self._preprocess_cache[key] = (intent, dict(entities))
+            if len(self._preprocess_cache) > self.PREPROCESS_CACHE_SIZE:
+                self._preprocess_cache.popitem(last=False)
+        return intent, entities
+
+    def get_embedding_results(self, user_query: str, top_k: int = 5,
+                              query_embedding=None) -> Dict[str, Any]:
         """
         Get results using embedding-based semantic search.
 
         Args:
             user_query: The user's natural language query
             top_k: Number of top results to retrieve
+            query_embedding: Optional precomputed, L2-normalized embedding of
+                user_query (skips encoding the query again)
 
         Returns:
-            Dictionary containing semantic search results
-        """
-        # Generate embedding for the query
-        query_embedding = self.embedding_model.encode(user_query).tolist()
-
-        # Search using vector index
-        cypher = f"""
-        CALL db.index.vector.queryNodes('{self.embedding_index}', $k, $vec)
-        YIELD node, score
-
-        MATCH (j:Journey)-[:HAS_VECTOR]->(node)
-        MATCH (p:Passenger)-[:TOOK]->(j)
-        MATCH (j)-[:ON]->(f:Flight)
-        MATCH (f)-[:DEPARTS_FROM]->(origin:Airport)
-        MATCH (f)-[:ARRIVES_AT]->(dest:Airport)
-
-        RETURN
-            score,
-            node.text AS semantic_text,
-            j.feedback_ID AS feedback_id,
-            j.arrival_delay_minutes AS delay,
-            j.food_satisfaction_score AS food_score,
-            j.actual_flown_miles AS miles,
-            j.passenger_class AS class,
-            p.generation AS generation,
-            p.loyalty_program_level AS loyalty,
-            f.flight_number AS flight_number,
-            f.fleet_type_description AS aircraft,
-            origin.station_code AS origin,
-            dest.station_code AS destination
-        ORDER BY score DESC
-        LIMIT $k
+            Dictionary containing semantic search results; "_snippets" holds
+            each record's context text (see format_context()), in order
         """
+        # Generate embedding for the query (unless the caller already has it).
+        # The vector indexes use vector.similarity_function 'cosine'; a
+        # unit-length query keeps scores consistent across models.
+        if query_embedding is None:
+            query_embedding = self._encode_cached(user_query)
+        # The neo4j driver packs numpy arrays itself, so there is no
+        # intermediate Python list; float32 matches the model output (no copy)
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        bolt_vec = self._bolt_vector(query_embedding)
+
+        # Near-duplicates of an earlier query reuse its rows (no Neo4j round trip)
+        record_cache = None
+        if self.semantic_cache:
+            record_cache = self._record_caches.setdefault(
+                top_k, SemanticCache(threshold=self.RECORD_CACHE_THRESHOLD))
+            hit = record_cache.get(query_embedding)
+            if hit is not None:
+                records, snippets = hit
+                return {
+                    "method": "embedding_semantic_search",
+                    "results": list(records),
+                    "_snippets": list(snippets),
+                    "query": user_query,
+                    "top_k": top_k
+                }
 
         try:
-            with self.driver.session() as session:
-                result = session.run(cypher, k=top_k, vec=query_embedding)
-                records = [dict(r) for r in result]
+            # Managed read transaction: rows are materialized before it closes,
+            # and transient cluster errors are retried by the driver
+            candidates = self._get_session().execute_read(
+                lambda tx: tx.run(self._embed_cypher, k_cand=top_k * self.CANDIDATE_FACTOR,
+                                  vec=bolt_vec).data())
+            # Keep the best-scoring row per feedback ID, in score order
+            seen = set()
+            records = []
+            for record in candidates:
+                feedback_id = record.get("feedback_id")
+                if feedback_id is not None:
+                    if feedback_id in seen:
+                        continue
+                    seen.add(feedback_id)
+                records.append(record)
+                if len(records) == top_k:
+                    break
+            # Format each record for the LLM context while it is at hand; kept
+            # beside the records so they are not serialized with each row
+            snippets = [self._format_embedding_record(record) for record in records]
+            if record_cache is not None and records:
+                record_cache.put(query_embedding, (records, snippets))
         except Exception as e:
             records = []
+            snippets = []
             print(f"Embedding search error: {e}")
 
         return {
             "method": "embedding_semantic_search",
             "results": records,
+            "_snippets": snippets,
             "query": user_query,
             "top_k": top_k
         }
 
-    def get_automated_query_results(self, user_query: str) -> Dict[str, Any]:
+    def _encode_cached(self, text: str):
         """
-        Get results by dynamically generating a Cypher query using GPT-4o.
-        """
-        schema_desc = """
-        Nodes & Properties:
-        - Passenger: generation, loyalty_program_level, record_locator
-        - Journey: arrival_delay_minutes, food_satisfaction_score, passenger_class, feedback_ID, actual_flown_miles
-        - Flight: flight_number, fleet_type_description
-        - Airport: station_code
+        Embed a query (L2-normalized), reusing the embedding of an earlier
+        query that differs from it only in whitespace.
 
-        Relationships:
-        - (:Passenger)-[:TOOK]->(:Journey)
-        - (:Journey)-[:ON]->(:Flight)
-        - (:Flight)-[:DEPARTS_FROM]->(:Airport)
-        - (:Flight)-[:ARRIVES_AT]->(:Airport)
-        """
-
-        prompt = f"""You are a Neo4j Cypher expert. 
-        Generate a READ-ONLY Cypher query for the following user question based on the schema below.
-        
-        SCHEMA:
-        {schema_desc}
+        Args:
+            text: Query text
 
-        RULES:
-        1. Return ONLY the Cypher query. No markdown, no explanations.
-        2. Use Case-Insensitive matching for strings if unsure (e.g. toLower(n.prop) CONTAINS 'value')
-        3. LIMIT results to 20 unless specified otherwise.
-        4. Do NOT use procedures like APOC.
-        5. For aggregations (averages, counts), return clear aliases.
+        Returns:
+            Normalized embedding as a numpy array
+        """
+        key = self._normalize_query(text)
+        embedding = self._cached_embedding(key)
+        if embedding is not None:
+            return embedding
+
+        with _import_torch().inference_mode():
+            embedding = self.embedding_model.encode(text, normalize_embeddings=True, convert_to_numpy=True)
+        # float32 all the way to the driver (no-op for float32 model output)
+        return self._store_embedding(key, embedding.astype(np.float32, copy=False))
+
+    @staticmethod
+    def _normalize_query(text: str) -> str:
+        """Embedding cache key: whitespace-collapsed text (case is kept, the model is cased)"""
+        return " ".join(text.split())
+
+    def _cached_embedding(self, key: str):
+        """Cached embedding for a normalized query, or None"""
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+            return embedding
+
+    def _store_embedding(self, key: str, embedding):
+        """Cache an embedding (read-only, since callers share it) and return it"""
+        embedding.setflags(write=False)
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+
+    def _bolt_vector(self, embedding: np.ndarray):
+        """
+        Query vector parameter for Neo4j: a native Vector (one float32 byte
+        buffer, no per-element boxing) when enabled, else the ndarray itself.
+        """
+        if self.native_vectors:
+            return Vector.from_numpy(embedding)
+        return embedding
 
-        User Question: {user_query}
+    def get_automated_query_results(self, user_query: str) -> Dict[str, Any]:
+        """
+        Get results by dynamically generating a Cypher query using GPT-4o.
         """
+        prompt = _AUTO_CYPHER_PROMPT.format(user_query=user_query)
 
         # Call GPT-4o to generate query
         generated_cypher = get_openai_gpt4_answer(prompt)
@@ -193,17 +651,14 @@ class LLMHandler:
         # Execute Query
         results = []
         try:
-            with self.driver.session() as session:
-                res = session.run(generated_cypher)
-                # Serialize results: Convert Nodes/Relationships to dicts
-                for record in res:
-                    row = {}
-                    for key, value in record.items():
-                        if hasattr(value, 'items') and callable(value.items):
-                             row[key] = dict(value.items())
-                        else:
-                             row[key] = value
-                    results.append(row)
+            res = self._get_session().run(generated_cypher)
+            # Serialize results: Convert Nodes/Relationships to dicts
+            graph_types = (Node, Relationship)
+            results = [
+                {key: dict(value) if isinstance(value, graph_types) else value
+                 for key, value in record.items()}
+                for record in res
+            ]
         except Exception as e:
             return {
                 "method": "automated_cypher",
@@ -243,43 +698,33 @@ class LLMHandler:
             "merged_data": []
         }
 
-        # Track seen feedback IDs to avoid duplicates
-        seen_ids = set()
-
-        # Helper to process a list of results
-        def process_list(source_name, data_list, score_key=None):
-            if isinstance(data_list, list) and data_list:
-                for item in data_list:
-                    # Try to find a unique ID
-                    item_id = item.get('feedback_ID') or item.get('feedback_id') or str(item)
-                    
-                    # For simple aggregations (no IDs), always add them
-                    if not (item.get('feedback_ID') or item.get('feedback_id')):
-                         combined["merged_data"].append({
-                            "source": source_name,
-                            "data": item
-                        })
-                    elif item_id and item_id not in seen_ids:
-                        seen_ids.add(item_id)
-                        entry = {"source": source_name, "data": item}
-                        if score_key and score_key in item:
-                            entry["score"] = item[score_key]
-                        combined["merged_data"].append(entry)
-
-        # 1. Add Automation Results (High Priority - Dynamic)
-        if automated_results:
-             process_list("automation", automated_results.get("results", []))
-
-        # 2. Add Baseline Results (Medium Priority - Fixed Templates)
-
-        # Add baseline results first (they're exact matches)
-        # 2. Add Baseline Results (Medium Priority - Fixed Templates)
-        baseline_data = baseline_results.get("results", [])
-        process_list("baseline", baseline_data)
-
-        # 3. Add Embedding Results (Lower Priority - Contextual)
-        embedding_data = embedding_results.get("results", [])
-        process_list("embedding", embedding_data, score_key="score")
+        # Single accumulator keyed by feedback ID; the first (highest priority)
+        # source wins for each ID and the entry is built only then. Rows
+        # without an ID (simple aggregations) get a unique positional key so
+        # they are always kept, in order.
+        merged = {}
+        sources = (
+            # 1. Automation Results (High Priority - Dynamic)
+            ("automation", automated_results.get("results", []) if automated_results else [], None),
+            # 2. Baseline Results (Medium Priority - Fixed Templates)
+            ("baseline", baseline_results.get("results", []), None),
+            # 3. Embedding Results (Lower Priority - Contextual)
+            ("embedding", embedding_results.get("results", []), "score"),
+        )
+        for source_name, data_list, score_key in sources:
+            if not isinstance(data_list, list):
+                continue
+            for item in data_list:
+                item_id = item.get('feedback_ID') or item.get('feedback_id')
+                if not item_id:
+                    merged[(None, len(merged))] = {"source": source_name, "data": item}
+                elif item_id not in merged:
+                    entry = {"source": source_name, "data": item}
+                    if score_key and score_key in item:
+                        entry["score"] = item[score_key]
+                    merged[item_id] = entry
+
+        combined["merged_data"] = list(merged.values())
 
         return combined
 
@@ -299,32 +744,69 @@ class LLMHandler:
         baseline = combined_results["baseline"]
         if baseline.get("results"):
             context_parts.append("=== FLIGHT DATABASE INFORMATION ===")
-            context_parts.append(f"Query Results: {json.dumps(baseline['results'], indent=2)}")
+            context_parts.append(f"Query Results: {self._dumps(baseline['results'])}")
 
         # Automation results
         automation = combined_results.get("automation", {})
         if automation.get("results"):
             context_parts.append("=== AUTOMATED QUERY RESULTS (GPT-4o Generated) ===")
             context_parts.append(f"Generated Cypher: {automation.get('generated_cypher')}")
-            context_parts.append(f"Results: {json.dumps(automation['results'], indent=2)}")
+            context_parts.append(f"Results: {self._dumps(automation['results'])}")
 
         # Embedding results - present as "Related Flight Information" without scores
         embedding = combined_results["embedding"]
         if embedding.get("results"):
+            # Snippets formatted by get_embedding_results(), if it produced these results
+            snippets = embedding.get("_snippets") or []
             context_parts.append("\n=== RELATED FLIGHT INFORMATION ===")
-            for i, result in enumerate(embedding["results"][:3], 1):  # Top 3
-                context_parts.append(f"\n--- Flight Record {i} ---")
-                if result.get('semantic_text'):
-                    context_parts.append(f"Summary: {result.get('semantic_text')}")
-                context_parts.append(f"Flight {result.get('flight_number')}: "
-                                   f"{result.get('origin')} → {result.get('destination')}, "
-                                   f"Aircraft: {result.get('aircraft')}, "
-                                   f"Arrival: {result.get('delay')} min {'early' if result.get('delay', 0) < 0 else 'delay' if result.get('delay', 0) > 0 else 'on time'}, "
-                                   f"Food Rating: {result.get('food_score')}/5, "
-                                   f"Passenger: {result.get('generation')}, {result.get('loyalty')}")
+            context_parts.append("\n".join(
+                f"\n--- Flight Record {i} ---\n"
+                f"{snippets[i - 1] if i <= len(snippets) else self._format_embedding_record(result)}"
+                for i, result in enumerate(embedding["results"][:3], 1)  # Top 3
+            ))
 
         return "\n".join(context_parts) if context_parts else "No relevant data found."
 
+    def _dumps(self, rows) -> str:
+        """
+        Serialize result rows for the context (compact unless pretty_context).
+        Lists longer than CONTEXT_MAX_ROWS are cut, with a note saying so, so
+        the model does not present a partial set as complete.
+        """
+        note = ""
+        if isinstance(rows, list) and len(rows) > self.CONTEXT_MAX_ROWS:
+            note = f" (showing {self.CONTEXT_MAX_ROWS} of {len(rows)} rows)"
+            rows = rows[:self.CONTEXT_MAX_ROWS]
+        if self.pretty_context:
+            return json.dumps(rows, indent=2) + note
+        if orjson is not None:
+            return orjson.dumps(rows).decode() + note
+        return json.dumps(rows, separators=(",", ":"), ensure_ascii=False) + note
+
+    @staticmethod
+    def _format_embedding_record(result: Dict) -> str:
+        """
+        Format one semantic search record as context lines for the LLM.
+
+        Args:
+            result: A record from get_embedding_results()
+
+        Returns:
+            Summary line (if any) and flight details line
+        """
+        get = result.get
+        delay = get('delay')
+        minutes = delay or 0
+        status = 'early' if minutes < 0 else 'delay' if minutes > 0 else 'on time'
+        flight = (f"Flight {get('flight_number')}: "
+                  f"{get('origin')} → {get('destination')}, "
+                  f"Aircraft: {get('aircraft')}, "
+                  f"Arrival: {delay} min {status}, "
+                  f"Food Rating: {get('food_score')}/5, "
+                  f"Passenger: {get('generation')}, {get('loyalty')}")
+        summary = get('semantic_text')
+        return f"Summary: {summary}\n{flight}" if summary else flight
+
     def create_structured_prompt(self, user_query: str, context: str, persona: str = None) -> str:
         """
         Create a structured prompt with Context, Persona, and Task.
@@ -337,60 +819,212 @@ class LLMHandler:
         Returns:
             Structured prompt string
         """
-        # Default persona for airline theme
         if not persona:
-            persona = """You are a Senior Airline Business Intelligence Analyst presenting insights to airline executives and operations managers.
-Your role is to transform flight data, passenger feedback, and operational metrics into actionable business insights that drive strategic decisions.
+            return "".join((_DEFAULT_PROMPT_PREFIX, context, _PROMPT_QUERY_HEAD, user_query, _PROMPT_QUERY_TAIL))
+        task = TASK_TEMPLATE.format_map({"user_query": user_query})
+        return PROMPT_TEMPLATE.format_map({"persona": persona, "context": context, "task": task})
 
-Your expertise includes:
-- Revenue optimization and passenger yield analysis
-- Route performance and network planning
-- Customer satisfaction drivers and loyalty program effectiveness
-- Operational efficiency, on-time performance, and delay root causes
-- Fleet utilization and aircraft performance comparisons
-- Competitive positioning and market share analysis
+    def _is_exact_hit(self, baseline_results: Dict) -> bool:
+        """Whether baseline returned rows for an intent it fully answers"""
+        results = baseline_results.get("results")
+        return baseline_results.get("intent") in self.STRUCTURED_INTENTS and \
+            isinstance(results, list) and len(results) > 0
 
-Communication style:
-- Present findings as strategic business insights, not raw data
-- Highlight trends, patterns, and anomalies that impact the bottom line
-- Recommend specific actions based on the data
-- Quantify business impact when possible (e.g., "This affects X% of passengers")
-- Use airline industry terminology appropriately"""
+    def _needs_query_embedding(self, retrieval_mode: str, use_embeddings: bool) -> bool:
+        """
+        Whether a query embedding is used: for embedding search, or for the
+        semantic cache when the caller enabled it. Baseline-only calls on a
+        default handler never load the embedding model.
+        """
+        return self.semantic_cache or self._uses_embedding_search(retrieval_mode, use_embeddings)
 
-        task = f"""Analyze the provided data and deliver business insights for airline management.
+    @staticmethod
+    def _uses_embedding_search(retrieval_mode: str, use_embeddings: bool) -> bool:
+        return retrieval_mode in ['embedding', 'hybrid', 'all'] or \
+            (retrieval_mode == 'baseline' and use_embeddings)  # Handle legacy flag
 
-CRITICAL RULES:
-- NEVER mention technical terms like "intents", "entities", "embeddings", "semantic search", "vector scores", or "knowledge graph"
-- NEVER display raw data structures, JSON, scores, or internal system details
-- NEVER say "based on the data provided" or reference how you retrieved information
-- DO present insights as if you analyzed this data yourself
+    async def _encode_batcher(self, queue: asyncio.Queue):
+        """
+        Coalesce queued encode requests into batched encode_queries() calls.
 
-Question: {user_query}
+        Waits for one request, then collects more until ENCODE_MAX_BATCH are
+        pending or ENCODE_MAX_WAIT has passed, and encodes them together off
+        the event loop. When cancelled (close()), requests that are still
+        waiting are cancelled too, so their callers do not hang.
+        """
+        loop = asyncio.get_running_loop()
+        pending = []
+        try:
+            while True:
+                pending = [await queue.get()]
+                deadline = loop.time() + self.ENCODE_MAX_WAIT
+                while len(pending) < self.ENCODE_MAX_BATCH:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Encode each distinct query once; encode_queries() length-sorts
+                # the batch internally, so padding is already minimal
+                texts = {key: text for key, text, _ in pending}
+                try:
+                    embeddings = await loop.run_in_executor(
+                        None, self.encode_queries, list(texts.values()), self.ENCODE_MAX_BATCH)
+                except Exception as e:
+                    for _, _, future in pending:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                by_key = {key: self._store_embedding(key, embedding) for key, embedding in zip(texts, embeddings)}
+                for key, _, future in pending:
+                    if not future.done():
+                        future.set_result(by_key[key])
+        except asyncio.CancelledError:
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            for _, _, future in pending:
+                future.cancel()
+            raise
+
+    async def encode_query_async(self, query: str):
+        """
+        Embed one query, batched with other queries awaiting at the same time.
 
-Your response MUST:
-1. Lead with the key business insight or finding
-2. Support with specific data points woven naturally into the narrative
-3. Explain the business implications (why this matters to the airline)
-4. Provide actionable recommendations when relevant
-5. Identify any concerning trends or opportunities for improvement
+        Returns:
+            L2-normalized embedding
+        """
+        key = self._normalize_query(query)
+        embedding = self._cached_embedding(key)
+        if embedding is not None:
+            return embedding
+
+        loop = asyncio.get_running_loop()
+        if self._encode_queue is None or self._encode_queue[0] is not loop:
+            queue = asyncio.Queue()
+            self._encode_queue = (loop, queue, loop.create_task(self._encode_batcher(queue)))
+        future = loop.create_future()
+        await self._encode_queue[1].put((key, query, future))
+        return await future
+
+    async def get_embedding_results_batched(self, queries: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Semantic search for many queries: the encodes are micro-batched and
+        the Neo4j searches run concurrently.
 
-Format your response as a professional business insight brief - concise, data-driven, and focused on what matters for airline operations and profitability."""
-        
-        prompt = f"""### PERSONA
-{persona}
+        Args:
+            queries: The user's natural language queries
+            top_k: Number of top results per query
 
-### CONTEXT (Knowledge Graph Data)
-{context}
+        Returns:
+            List of get_embedding_results() results, in query order
+        """
+        loop = asyncio.get_running_loop()
+        embeddings = await asyncio.gather(*(self.encode_query_async(q) for q in queries))
+        return list(await asyncio.gather(*(
+            loop.run_in_executor(self._retrieval_pool, self.get_embedding_results, q, top_k, embedding)
+            for q, embedding in zip(queries, embeddings)
+        )))
+
+    def encode_queries(self, queries: List[str], batch_size: int = 32):
+        """
+        Embed many queries in one batched forward pass.
 
-### TASK
-{task}
+        sentence-transformers sorts the inputs by length before batching
+        (and restores the order afterwards), so padding is already minimal.
 
-### ANSWER
-"""
-        return prompt
+        Args:
+            queries: Queries to embed
+            batch_size: Encoder batch size
+
+        Returns:
+            Array of L2-normalized embeddings, one row per query
+        """
+        with _import_torch().inference_mode():
+            embeddings = self.embedding_model.encode(
+                queries,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        return embeddings.astype(np.float32, copy=False)
+
+    def prewarm_embeddings(self, queries: List[str], batch_size: int = 32) -> int:
+        """
+        Embed the queries that are not cached yet in one batched forward pass
+        and put them in the embedding cache, so later calls for the same
+        queries (generate_answer(), prepare_context(), encode_query_async())
+        skip the encoder.
+
+        Args:
+            queries: Queries that are about to be answered
+            batch_size: Encoder batch size
+
+        Returns:
+            Number of queries that were embedded
+        """
+        pending = {}
+        for query in queries:
+            key = self._normalize_query(query)
+            if key not in pending and self._cached_embedding(key) is None:
+                pending[key] = query
+        if pending:
+            for key, embedding in zip(pending, self.encode_queries(list(pending.values()), batch_size)):
+                self._store_embedding(key, embedding)
+        return len(pending)
+
+    def generate_answers_batch(self, queries: List[str], model: str = "llama-3.1-8b-instant",
+                               temperature: float = 0.1, retrieval_mode: str = "baseline",
+                               use_embeddings: bool = False, verbose: bool = True) -> List[Dict[str, Any]]:
+        """
+        Generate answers for many queries, embedding them all in one batch.
+
+        Args:
+            queries: The user's natural language queries
+            model: LLM model to use
+            temperature: Temperature for generation
+            retrieval_mode: See generate_answer()
+            use_embeddings: See generate_answer()
+            verbose: See generate_answer()
+
+        Returns:
+            List of generate_answer() results, in query order
+        """
+        embeddings = [None] * len(queries)
+        if queries and self._needs_query_embedding(retrieval_mode, use_embeddings):
+            embeddings = self.encode_queries(queries)
+
+        return [
+            self.generate_answer(query, model=model, temperature=temperature,
+                                 retrieval_mode=retrieval_mode, use_embeddings=use_embeddings,
+                                 query_embedding=embedding, verbose=verbose)
+            for query, embedding in zip(queries, embeddings)
+        ]
+
+    async def generate_answer_async(self, user_query: str, **kwargs) -> Dict[str, Any]:
+        """
+        Awaitable generate_answer() for asyncio callers.
+
+        The pipeline runs in a worker thread, so the event loop stays free
+        while the retrieval paths (which already run concurrently on the
+        retrieval pool) and the LLM call are in flight; several queries or
+        models can be awaited together with asyncio.gather.
+
+        Args:
+            user_query: The user's natural language query
+            **kwargs: Any generate_answer() keyword argument
+
+        Returns:
+            Same as generate_answer()
+        """
+        return await asyncio.to_thread(self.generate_answer, user_query, **kwargs)
 
     def generate_answer(self, user_query: str, model: str = "llama-3.1-8b-instant",
-                       temperature: float = 0.1, retrieval_mode: str = "baseline", use_embeddings: bool = False) -> Dict[str, Any]:
+                       temperature: float = 0.1, retrieval_mode: str = "baseline", use_embeddings: bool = False,
+                       query_embedding=None, verbose: bool = True, context: str = None) -> Dict[str, Any]:
         """
         Generate a complete answer using the Graph-RAG pipeline.
 
@@ -401,26 +1035,103 @@ Format your response as a professional business insight brief - concise, data-dr
             # mode: 'baseline', 'embedding', 'hybrid', 'automation', 'all'
             retrieval_mode: str = 'baseline' 
             use_embeddings: bool = True # Deprecated, kept for backward compat
+            query_embedding: Optional precomputed, L2-normalized query embedding
+            verbose: Return the full pipeline state (retrieval results, context,
+                prompt); when False only query, answer, model and cache_hit
+                are returned
+            context: Already formatted context for this query (e.g. from an
+                earlier call); retrieval and the semantic cache are skipped.
+                Passing the same context to several models gives them
+                byte-identical prompt prefixes, which providers with prompt
+                caching reuse
 
         Returns:
-            Dictionary containing query, context, prompt, and answer
+            Dictionary containing query, context, prompt, and answer;
+            cache_hit is True when the answer came from the semantic cache
         """
-        # Initialize result containers
-        baseline_results = {}
-        embedding_results = {}
-        automated_results = {}
+        if context is not None:
+            return self.generate_answer_with_context(
+                user_query, {"context": context}, model=model, temperature=temperature, verbose=verbose)
+
+        # Embed the query once; shared by the cache lookup and semantic search
+        query_vec = query_embedding
+        if query_vec is None and self._needs_query_embedding(retrieval_mode, use_embeddings):
+            query_vec = self._encode_cached(user_query)
+
+        # Step 0: Semantic cache lookup (paraphrases of earlier queries)
+        cache = None
+        if self.semantic_cache:
+            cache_key = (model, temperature, retrieval_mode, use_embeddings)
+            cache = self._answer_caches.setdefault(
+                cache_key, SemanticCache(threshold=self.cache_threshold, ttl=self.cache_ttl))
+            cached = cache.get(query_vec)
+            if cached is not None:
+                hit = dict(cached, cache_hit=True)
+                return hit if verbose else self._brief(hit)
+
+        # Steps 1-4: Retrieval, combination and context
+        prepared = self.prepare_context(user_query, retrieval_mode, use_embeddings, query_vec)
+
+        # Steps 5-6: Create structured prompt and get LLM response
+        result, answer_ok = self._answer_from_context(user_query, prepared, model, temperature)
+
+        if cache is not None and answer_ok:
+            cache.put(query_vec, result)
+
+        return result if verbose else self._brief(result)
+
+    def prepare_context(self, user_query: str, retrieval_mode: str = "baseline", use_embeddings: bool = False,
+                        query_embedding=None) -> Dict[str, Any]:
+        """
+        Run the retrieval half of the pipeline: retrieve, combine and format
+        the context. The result can be answered by any number of models with
+        generate_answer_with_context() without retrieving again.
+
+        Args:
+            user_query: The user's natural language query
+            retrieval_mode: Same as generate_answer()
+            use_embeddings: Same as generate_answer()
+            query_embedding: Optional precomputed, L2-normalized query embedding
+
+        Returns:
+            Dictionary containing baseline_results, embedding_results,
+            automated_results, combined_results and context
+        """
+        # Steps 1-2: Retrieval. The paths are independent (each does its own
+        # Neo4j round trip), so when more than one is enabled they run
+        # concurrently and the wall-clock cost is the slowest path, not the sum.
+        retrievals = {}
 
         # 1. Baseline logic
         if retrieval_mode in ['baseline', 'hybrid', 'all']:
-             baseline_results = self.get_baseline_results(user_query)
+            retrievals["baseline"] = (self.get_baseline_results, (user_query,))
 
         # 2. Embedding logic
-        if retrieval_mode in ['embedding', 'hybrid', 'all'] or (retrieval_mode == 'baseline' and use_embeddings): # Handle legacy flag
-             embedding_results = self.get_embedding_results(user_query)
+        if self._uses_embedding_search(retrieval_mode, use_embeddings):
+            retrievals["embedding"] = (self.get_embedding_results, (user_query, 5, query_embedding))
 
         # 3. Automation logic (New)
         if retrieval_mode in ['automation', 'all']:
-             automated_results = self.get_automated_query_results(user_query)
+            retrievals["automation"] = (self.get_automated_query_results, (user_query,))
+
+        # Optionally hold the semantic search back until baseline has answered
+        deferred = None
+        if self.skip_embeddings_on_exact_hit and "baseline" in retrievals and "embedding" in retrievals:
+            deferred = retrievals.pop("embedding")
+
+        if len(retrievals) > 1:
+            futures = {name: self._retrieval_pool.submit(fn, *args) for name, (fn, args) in retrievals.items()}
+            retrieved = {name: future.result() for name, future in futures.items()}
+        else:
+            retrieved = {name: fn(*args) for name, (fn, args) in retrievals.items()}
+
+        if deferred and not self._is_exact_hit(retrieved["baseline"]):
+            fn, args = deferred
+            retrieved["embedding"] = fn(*args)
+
+        baseline_results = retrieved.get("baseline", {})
+        embedding_results = retrieved.get("embedding", {})
+        automated_results = retrieved.get("automation", {})
 
         # Step 3: Combine results
         combined_results = self.combine_results(baseline_results, embedding_results, automated_results)
@@ -428,26 +1139,70 @@ Format your response as a professional business insight brief - concise, data-dr
         # Step 4: Format context
         context = self.format_context(combined_results)
 
-        # Step 5: Create structured prompt
+        return {
+            "baseline_results": baseline_results,
+            "embedding_results": embedding_results,
+            "automated_results": automated_results,
+            "combined_results": combined_results,
+            "context": context
+        }
+
+    def generate_answer_with_context(self, user_query: str, prepared: Dict[str, Any],
+                                     model: str = "llama-3.1-8b-instant", temperature: float = 0.1,
+                                     verbose: bool = True) -> Dict[str, Any]:
+        """
+        Answer a query from a prepare_context() result, skipping retrieval
+        and the semantic cache. Every model answering the same prepared
+        context gets a byte-identical prompt prefix.
+
+        Args:
+            user_query: The user's natural language query
+            prepared: prepare_context() result (only "context" is required)
+            model: LLM model to use
+            temperature: Temperature for generation
+            verbose: Same as generate_answer()
+
+        Returns:
+            Same as generate_answer()
+        """
+        result = self._answer_from_context(user_query, prepared, model, temperature)[0]
+        return result if verbose else self._brief(result)
+
+    def _answer_from_context(self, user_query: str, prepared: Dict[str, Any], model: str, temperature: float):
+        """
+        Build the prompt around a prepared context and ask the LLM.
+
+        Returns:
+            Tuple of (generate_answer() result, whether the LLM answered)
+        """
+        context = prepared["context"]
         prompt = self.create_structured_prompt(user_query, context)
 
-        # Step 6: Get LLM response
         try:
             answer = get_answer(prompt, model=model, temperature=temperature)
+            answer_ok = True
         except Exception as e:
             answer = f"Error generating answer: {e}"
+            answer_ok = False
 
         return {
             "query": user_query,
-            "baseline_results": baseline_results,
-            "embedding_results": embedding_results,
-            "automated_results": automated_results,
-            "combined_results": combined_results,
+            "baseline_results": prepared.get("baseline_results", {}),
+            "embedding_results": prepared.get("embedding_results", {}),
+            "automated_results": prepared.get("automated_results", {}),
+            "combined_results": prepared.get("combined_results", {}),
             "context": context,
             "prompt": prompt,
             "answer": answer,
-            "model": model
-        }
+            "model": model,
+            "cache_hit": False
+        }, answer_ok
+
+    @staticmethod
+    def _brief(result: Dict) -> Dict[str, Any]:
+        """The answer-only view of a generate_answer() result"""
+        return {"query": result["query"], "answer": result["answer"], "model": result["model"],
+                "cache_hit": result["cache_hit"]}
 
 
 # Test the LLM Handler
@@ -4,15 +4,54 @@ Model Comparison Framework
 Compares multiple LLM models on the same queries
 """
 import os
+import re
 import sys
-import time
 import json
+import time
+import hashlib
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson  # Optional: faster reading and writing of JSON files
+except ImportError:
+    orjson = None
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from MS3.LLM_layer.llm_handler import LLMHandler
+from MS3.LLM_layer.cache_paths import cache_dir
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _loads(data):
+    """Parse JSON bytes, with orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code. Inside a running
+    event loop (Jupyter, async callers) asyncio.run() would raise, so the
+    coroutine gets its own loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _canon(question: str) -> str:
+    """Lowercase a question and collapse its whitespace, for lookups"""
+    return _WHITESPACE.sub(" ", question.strip().lower())
 
 
 class ModelComparator:
@@ -64,15 +103,57 @@ class ModelComparator:
         }
     }
 
-    def __init__(self, llm_handler: LLMHandler = None, test_results_path: str = None):
+    # Display name per model ID, built once
+    _DISPLAY_NAMES = {model_key: info["name"] for model_key, info in MODELS.items()}
+
+    # One model's row in the print_summary() table
+    _SUMMARY_ROW = "{name:<30} {accuracy:>6.1f}%     {success:>6.1f}%   {time:>9}    {words:>8.1f}    {cached:>6.1f}%"
+
+    # Retries for rate-limited (HTTP 429) calls, with exponential backoff
+    RATE_LIMIT_RETRIES = 4
+    RATE_LIMIT_BACKOFF = 1.0  # seconds, doubled per retry
+
+    def __init__(self, llm_handler: LLMHandler = None, test_results_path: str = None,
+                 max_concurrency: int = 8, max_retrieval_concurrency: int = 1,
+                 answer_cache: bool = False, answer_cache_path: str = None):
         """
         Initialize the model comparator.
 
         Args:
             llm_handler: LLMHandler instance (creates new one if not provided)
             test_results_path: Path to test_results_final.json for accuracy comparison
+            max_concurrency: Most model calls in flight at once in batch runs
+                (keep under the Groq per-key rate limit)
+            max_retrieval_concurrency: Most query retrievals (Neo4j queries and
+                the query preprocessor) in flight at once in batch runs; the
+                preprocessor is not known to be thread-safe, so 1 by default
+            answer_cache: Reuse stored answers for queries already run against a
+                model, across runs, instead of calling the model again. Off
+                by default: stored answers predate any prompt or model
+                change, and their response time is 0
+            answer_cache_path: File the answer cache is kept in (default: in
+                the user cache directory)
         """
         self.handler = llm_handler if llm_handler else LLMHandler()
+        self.max_concurrency = max_concurrency
+        self.max_retrieval_concurrency = max_retrieval_concurrency
+
+        # Canonical query -> {"query": ..., "answers": {"<model>|<use_embeddings>": result}}.
+        # Only the same question hits, so cached answers are scored against
+        # their own retrieval rows.
+        self.answer_cache = None
+        if answer_cache:
+            if answer_cache_path is None:
+                answer_cache_path = os.path.join(cache_dir(), 'comparison_answers.json')
+            self.answer_cache_path = answer_cache_path
+            self.answer_cache = {}
+            try:
+                with open(answer_cache_path, 'rb') as f:
+                    self.answer_cache = _loads(f.read())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"⚠ Ignoring unreadable answer cache {answer_cache_path}: {e}")
         self.results = []
         self.expected_results = {}
 
@@ -89,16 +170,39 @@ class ModelComparator:
         """
         Load expected results from test_results_final.json.
 
+        The parsed mapping is kept as JSON in the user cache directory,
+        keyed by a hash of the file's content, and reused while the
+        content is unchanged.
+
         Args:
             filepath: Path to the test results JSON file
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"⚠ Could not load expected results: {e}")
+            self.expected_results = {}
+            return
 
-            # Create a mapping from question_text to expected results
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir(), f"expected_results-{digest}.json")
+        try:
+            with open(cache_path, 'rb') as f:
+                self.expected_results = _loads(f.read())
+            print(f"✓ Loaded {len(self.expected_results)} expected results from test file")
+            return
+        except FileNotFoundError:
+            pass  # First load of this content
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable expected results cache {cache_path}: {e}")
+
+        try:
+            data = _loads(raw)
+
+            # Create a mapping from canonical question_text to expected results
             for result in data.get('results', []):
-                question = result.get('question_text', '').strip()
+                question = _canon(result.get('question_text', ''))
                 if question:
                     self.expected_results[question] = {
                         'question_id': result.get('question_id'),
@@ -112,6 +216,13 @@ class ModelComparator:
         except Exception as e:
             print(f"⚠ Could not load expected results: {e}")
             self.expected_results = {}
+            return
+
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.expected_results, f, ensure_ascii=False, default=str)
+        except OSError:
+            pass  # Unwritable cache directory; parse again next time
 
     def compare_with_expected(self, query: str, actual_result: Dict) -> Dict[str, Any]:
         """
@@ -124,7 +235,7 @@ class ModelComparator:
         Returns:
             Comparison metrics including accuracy
         """
-        expected = self.expected_results.get(query.strip())
+        expected = self.expected_results.get(_canon(query))
 
         if not expected:
             return {
@@ -134,8 +245,9 @@ class ModelComparator:
             }
 
         # Get actual intent and results
-        actual_intent = actual_result.get('baseline_results', {}).get('intent')
-        actual_query_results = actual_result.get('baseline_results', {}).get('results', [])
+        baseline_results = actual_result.get('baseline_results', {})
+        actual_intent = baseline_results.get('intent')
+        actual_query_results = baseline_results.get('results', [])
         actual_result_count = len(actual_query_results) if isinstance(actual_query_results, list) else 0
 
         # Compare intent
@@ -163,78 +275,147 @@ class ModelComparator:
             'expected_success': expected['success']
         }
 
-    def run_single_comparison(self, query: str, models: List[str],
-                            use_embeddings: bool = True) -> Dict[str, Any]:
+    @staticmethod
+    def _is_rate_limited(result: Dict) -> bool:
+        """Whether the handler reported a rate-limit error instead of an answer"""
+        answer = result.get("answer") or ""
+        return answer.startswith("Error generating answer") and \
+            ("429" in answer or "rate limit" in answer.lower())
+
+    def save_answer_cache(self):
+        """Write the answer cache to answer_cache_path."""
+        if self.answer_cache is not None:
+            try:
+                with open(self.answer_cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.answer_cache, f, ensure_ascii=False, default=str)
+            except OSError as e:
+                print(f"⚠ Could not save the answer cache: {e}")
+
+    async def _retrieve(self, query: str, use_embeddings: bool, semaphore: asyncio.Semaphore = None):
+        """
+        Run the handler's retrieval for a query (in a worker thread) and time it,
+        holding semaphore (if given) while it runs.
+
+        Returns:
+            Tuple of (prepare_context() result, retrieval_time)
+        """
+        if semaphore is not None:
+            async with semaphore:
+                return await self._retrieve(query, use_embeddings)
+
+        start_time = time.perf_counter()
+        prepared = await asyncio.to_thread(self.handler.prepare_context, query, use_embeddings=use_embeddings)
+        return prepared, time.perf_counter() - start_time
+
+    @staticmethod
+    def _retrieval_time(retrieval: asyncio.Future = None):
+        """Time of a finished _retrieve() task, or None if it did not run or failed"""
+        if retrieval is None or retrieval.cancelled() or retrieval.exception() is not None:
+            return None
+        return retrieval.result()[1]
+
+    async def _call_model(self, query: str, model_key: str, use_embeddings: bool,
+                          retrievals: Dict[str, asyncio.Future], semaphore: asyncio.Semaphore = None,
+                          retrieval_semaphore: asyncio.Semaphore = None):
+        """
+        Answer one query with one model (in a worker thread) and time it.
+        Retrieval runs once per query: the first model that needs it starts
+        it in retrievals and the others await the same task, so
+        response_time covers only the model call. Rate-limited calls are
+        retried with exponential backoff. Answers stored in the answer cache
+        for the same question are returned with a response time of 0.
+
+        Returns:
+            Tuple of (model_key, result or None, response_time, error)
+        """
+        cache_key = f"{model_key}|{use_embeddings}"
+        if self.answer_cache is not None:
+            entry = self.answer_cache.get(_canon(query))
+            if entry is not None and cache_key in entry["answers"]:
+                result = dict(entry["answers"][cache_key], cached=True, cache_source_query=entry["query"])
+                return model_key, result, 0.0, None
+
+        if query not in retrievals:
+            retrievals[query] = asyncio.ensure_future(self._retrieve(query, use_embeddings, retrieval_semaphore))
+
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            try:
+                prepared = (await retrievals[query])[0]
+                if semaphore is None:
+                    start_time = time.perf_counter()
+                    result = await asyncio.to_thread(
+                        self.handler.generate_answer_with_context, query, prepared,
+                        model=model_key, temperature=0.1)
+                else:
+                    async with semaphore:
+                        start_time = time.perf_counter()
+                        result = await asyncio.to_thread(
+                            self.handler.generate_answer_with_context, query, prepared,
+                            model=model_key, temperature=0.1)
+                response_time = time.perf_counter() - start_time
+            except Exception as e:
+                return model_key, None, None, e
+
+            if attempt == self.RATE_LIMIT_RETRIES or not self._is_rate_limited(result):
+                if self.answer_cache is not None and \
+                        not (result.get("answer") or "").startswith("Error generating answer"):
+                    entry = self.answer_cache.setdefault(_canon(query), {"query": query, "answers": {}})
+                    entry["answers"][cache_key] = result
+                return model_key, result, response_time, None
+            await asyncio.sleep(self.RATE_LIMIT_BACKOFF * 2 ** attempt)
+
+    async def run_single_comparison_async(self, query: str, models: List[str],
+                                          use_embeddings: bool = True,
+                                          timestamp: str = None) -> Dict[str, Any]:
         """
-        Run a single query across multiple models.
+        Run a single query across multiple models, all models in flight at once.
 
         Args:
             query: The test query
             models: List of model names to test
             use_embeddings: Whether to use embedding-based retrieval
+            timestamp: ISO timestamp to record (default: now)
 
         Returns:
             Comparison results for this query
         """
+        # Total time is the slowest model instead of the sum over models
+        retrievals = {}
+        calls = await asyncio.gather(*(self._call_model(query, m, use_embeddings, retrievals) for m in models))
+        self.save_answer_cache()
+        return self._assemble_comparison(query, use_embeddings, calls, timestamp,
+                                         self._retrieval_time(retrievals.get(query)))
+
+    def _assemble_comparison(self, query: str, use_embeddings: bool, calls: List[tuple],
+                             timestamp: str = None, retrieval_time: float = None) -> Dict[str, Any]:
+        """
+        Build (and print) the comparison entry for one query from its
+        _call_model() outcomes, in model order. retrieval_time is the one
+        shared retrieval (None if every model was answered from the cache).
+        """
         comparison = {
             "query": query,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "use_embeddings": use_embeddings,
+            "retrieval_time": retrieval_time,
             "models": {}
         }
 
+        # Report once everything is back, so output does not interleave
         print(f"\n{'='*80}")
         print(f"Query: {query}")
         print(f"{'='*80}")
+        if retrieval_time is not None:
+            print(f"Retrieval time: {retrieval_time:.2f}s (shared by all models)")
 
-        for model_key in models:
+        for model_key, result, response_time, error in calls:
             # model_key is now the full model ID (e.g., "llama-3.1-8b-instant")
-            model_info = self.MODELS.get(model_key, {})
-            model_display_name = model_info.get("name", model_key)
+            model_display_name = self._DISPLAY_NAMES.get(model_key, model_key)
 
             print(f"\nTesting model: {model_display_name} ({model_key})")
 
-            try:
-                # Measure response time
-                start_time = time.time()
-
-                result = self.handler.generate_answer(
-                    user_query=query,
-                    model=model_key,
-                    temperature=0.1,
-                    use_embeddings=use_embeddings
-                )
-
-                response_time = time.time() - start_time
-
-                # Extract metrics
-                answer = result["answer"]
-                answer_length = len(answer) if answer else 0
-                word_count = len(answer.split()) if answer else 0
-
-                # Compare with expected results
-                accuracy_check = self.compare_with_expected(query, result)
-
-                comparison["models"][model_key] = {
-                    "model_name": model_display_name,
-                    "model_id": model_key,
-                    "answer": answer,
-                    "response_time": response_time,
-                    "answer_length": answer_length,
-                    "word_count": word_count,
-                    "context_length": len(result.get("context", "")),
-                    "baseline_results_count": len(result.get("baseline_results", {}).get("results", [])),
-                    "embedding_results_count": len(result.get("embedding_results", {}).get("results", [])),
-                    "accuracy_check": accuracy_check,
-                    "correct": accuracy_check.get('matches_expected', False),
-                    "error": None
-                }
-
-                match_indicator = "✓" if accuracy_check.get('matches_expected') else "✗"
-                print(f"{match_indicator} Response time: {response_time:.2f}s | Words: {word_count} | Correct: {accuracy_check.get('matches_expected', 'N/A')}")
-
-            except Exception as e:
-                print(f"✗ Error: {e}")
+            if error is not None:
+                print(f"✗ Error: {error}")
                 comparison["models"][model_key] = {
                     "model_name": model_display_name,
                     "model_id": model_key,
@@ -242,42 +423,135 @@ class ModelComparator:
                     "response_time": None,
                     "accuracy_check": {'has_expected': False, 'matches_expected': False},
                     "correct": False,
-                    "error": str(e)
+                    "error": str(error)
                 }
+                continue
+
+            # Extract metrics
+            answer = result["answer"]
+            word_count = len(answer.split()) if answer else 0
+            baseline_results = result.get("baseline_results") or {}
+            embedding_results = result.get("embedding_results") or {}
+
+            # Compare with expected results
+            accuracy_check = self.compare_with_expected(query, result)
+
+            comparison["models"][model_key] = {
+                "model_name": model_display_name,
+                "model_id": model_key,
+                "answer": answer,
+                "response_time": response_time,
+                "answer_length": len(answer) if answer else 0,
+                "word_count": word_count,
+                "context_length": len(result.get("context") or ""),
+                "baseline_results_count": len(baseline_results.get("results") or []),
+                "embedding_results_count": len(embedding_results.get("results") or []),
+                "accuracy_check": accuracy_check,
+                "correct": accuracy_check.get('matches_expected', False),
+                "cached": result.get("cached", False),
+                "cache_source_query": result.get("cache_source_query"),
+                "error": None
+            }
+
+            match_indicator = "✓" if accuracy_check.get('matches_expected') else "✗"
+            cached_note = " (cached)" if result.get("cached") else ""
+            print(f"{match_indicator} Response time: {response_time:.2f}s{cached_note} | Words: {word_count} | Correct: {accuracy_check.get('matches_expected', 'N/A')}")
 
         return comparison
 
-    def run_batch_comparison(self, queries: List[str], models: List[str],
-                           use_embeddings: bool = True) -> List[Dict[str, Any]]:
+    def run_single_comparison(self, query: str, models: List[str],
+                            use_embeddings: bool = True, timestamp: str = None) -> Dict[str, Any]:
         """
-        Run multiple queries across multiple models.
+        Run a single query across multiple models (see run_single_comparison_async).
+        Safe to call from inside a running event loop, which it blocks until
+        done; async callers should await the _async variant instead.
 
         Args:
-            queries: List of test queries
+            query: The test query
             models: List of model names to test
             use_embeddings: Whether to use embedding-based retrieval
+            timestamp: ISO timestamp to record (default: now)
 
         Returns:
-            List of comparison results
+            Comparison results for this query
         """
-        results = []
+        return _run_sync(self.run_single_comparison_async(query, models, use_embeddings, timestamp))
 
+    async def run_batch_comparison_async(self, queries: List[str], models: List[str],
+                                         use_embeddings: bool = True) -> List[Dict[str, Any]]:
+        """
+        Run multiple queries across multiple models, with up to max_concurrency
+        (query, model) calls in flight at once.
+
+        Args:
+            queries: List of test queries
+            models: List of model names to test
+            use_embeddings: Whether to use embedding-based retrieval
+
+        Returns:
+            List of comparison results, in query order
+        """
         print(f"\n{'#'*80}")
         print(f"BATCH COMPARISON: {len(queries)} queries × {len(models)} models")
         print(f"{'#'*80}")
 
-        for i, query in enumerate(queries, 1):
-            print(f"\n[Query {i}/{len(queries)}]")
-            comparison = self.run_single_comparison(query, models, use_embeddings)
-            results.append(comparison)
+        # Every query in the batch is stamped with the batch start time
+        batch_start = datetime.now().isoformat()
+
+        # Each distinct (query, model) pair is called once; repeats reuse it
+        work = list(dict.fromkeys((query, model_key) for query in queries for model_key in models))
+        total = len(queries) * len(models)
+        if len(work) < total:
+            print(f"Deduplicated {total} (query, model) pairs to {len(work)} "
+                  f"({len(work) / total:.0%} of the calls)")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        retrieval_semaphore = asyncio.Semaphore(self.max_retrieval_concurrency)
+        retrievals = {}
+        calls = await asyncio.gather(*(
+            self._call_model(query, model_key, use_embeddings, retrievals, semaphore, retrieval_semaphore)
+            for query, model_key in work
+        ))
+        self.save_answer_cache()
+        outcomes = dict(zip(work, calls))
+
+        results = []
+        for i, query in enumerate(queries):
+            print(f"\n[Query {i + 1}/{len(queries)}]")
+            query_calls = [outcomes[(query, model_key)] for model_key in models]
+            results.append(self._assemble_comparison(query, use_embeddings, query_calls, batch_start,
+                                                     self._retrieval_time(retrievals.get(query))))
 
         self.results = results
         return results
 
-    def generate_summary(self) -> Dict[str, Any]:
+    def run_batch_comparison(self, queries: List[str], models: List[str],
+                           use_embeddings: bool = True) -> List[Dict[str, Any]]:
+        """
+        Run multiple queries across multiple models (see run_batch_comparison_async).
+        Safe to call from inside a running event loop, which it blocks until
+        done; async callers should await the _async variant instead.
+
+        Args:
+            queries: List of test queries
+            models: List of model names to test
+            use_embeddings: Whether to use embedding-based retrieval
+
+        Returns:
+            List of comparison results
+        """
+        return _run_sync(self.run_batch_comparison_async(queries, models, use_embeddings))
+
+    def generate_summary(self, timestamp: str = None, include_cached_timings: bool = False) -> Dict[str, Any]:
         """
         Generate summary statistics from all comparisons.
 
+        Args:
+            timestamp: ISO timestamp to record (default: now)
+            include_cached_timings: Count answer-cache hits (response time 0)
+                in the response time statistics; they always count towards
+                accuracy and success
+
         Returns:
             Summary statistics dictionary
         """
@@ -287,53 +561,61 @@ class ModelComparator:
         summary = {
             "total_queries": len(self.results),
             "models": {},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         }
 
-        # Collect all model keys
-        all_models = set()
+        # Collect per-model counters and timings in a single pass over the results
+        stats = defaultdict(lambda: {"times": [], "words": [], "correct": 0, "with_expected": 0,
+                                     "attempts": 0, "cached": 0})
         for result in self.results:
-            all_models.update(result["models"].keys())
-
-        # Calculate statistics per model
-        for model_key in all_models:
-            model_data = []
-            all_attempts = []
-
-            for result in self.results:
-                if model_key in result["models"]:
-                    model_result = result["models"][model_key]
-                    all_attempts.append(model_result)
-                    if model_result["response_time"] is not None:
-                        model_data.append(model_result)
-
-            if model_data:
-                avg_response_time = sum(d["response_time"] for d in model_data) / len(model_data)
-                avg_word_count = sum(d["word_count"] for d in model_data) / len(model_data)
-                success_rate = len(model_data) / len(self.results)
-
-                # Calculate accuracy based on comparison with expected results
-                correct_count = sum(1 for d in all_attempts if d.get("correct", False))
-                accuracy = correct_count / len(all_attempts) if all_attempts else 0
-
-                # Count queries with expected results available
-                queries_with_expected = sum(1 for d in all_attempts
-                                          if d.get("accuracy_check", {}).get("has_expected", False))
-
+            for model_key, model_result in result["models"].items():
+                acc = stats[model_key]
+                acc["attempts"] += 1
+                if model_result.get("correct", False):
+                    acc["correct"] += 1
+                if model_result.get("accuracy_check", {}).get("has_expected", False):
+                    acc["with_expected"] += 1
+
+                if model_result["response_time"] is not None:
+                    acc["words"].append(model_result["word_count"])
+                    if model_result.get("cached"):
+                        acc["cached"] += 1
+                        if not include_cached_timings:
+                            continue
+                    acc["times"].append(model_result["response_time"])
+
+        # Calculate statistics per model (vectorized over each model's timings)
+        for model_key, acc in stats.items():
+            answered = len(acc["words"])
+            if answered:
+                # Timing stats are None when every answer came from the cache
+                times = np.asarray(acc["times"], dtype=np.float64)
+                p50, p95 = np.percentile(times, (50, 95)) if times.size else (None, None)
                 summary["models"][model_key] = {
-                    "total_queries": len(model_data),
-                    "success_rate": success_rate,
-                    "accuracy": accuracy,
-                    "correct_count": correct_count,
-                    "queries_with_expected": queries_with_expected,
-                    "avg_response_time": avg_response_time,
-                    "avg_word_count": avg_word_count,
-                    "min_response_time": min(d["response_time"] for d in model_data),
-                    "max_response_time": max(d["response_time"] for d in model_data)
+                    "total_queries": answered,
+                    "success_rate": answered / len(self.results),
+                    # Accuracy is based on comparison with expected results
+                    "accuracy": acc["correct"] / acc["attempts"],
+                    "correct_count": acc["correct"],
+                    "queries_with_expected": acc["with_expected"],
+                    "avg_response_time": float(times.mean()) if times.size else None,
+                    "avg_word_count": float(np.mean(acc["words"])),
+                    "min_response_time": float(times.min()) if times.size else None,
+                    "max_response_time": float(times.max()) if times.size else None,
+                    "p50_response_time": float(p50) if times.size else None,
+                    "p95_response_time": float(p95) if times.size else None,
+                    "cache_hit_rate": acc["cached"] / answered
                 }
 
         return summary
 
+    @staticmethod
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON with 2-space indentation"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
     def save_results(self, filename: str = "model_comparison_results.json"):
         """
         Save comparison results to a JSON file.
@@ -341,15 +623,18 @@ class ModelComparator:
         Args:
             filename: Output filename
         """
-        output = {
-            "summary": self.generate_summary(),
-            "detailed_results": self.results
-        }
-
         filepath = os.path.join(os.path.dirname(__file__), filename)
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        # Written one result at a time, each re-indented to its nesting level,
+        # so the file matches json.dump(indent=2) without building it in memory
+        with open(filepath, 'wb') as f:
+            f.write(b'{\n  "summary": ')
+            f.write(self._dumps(self.generate_summary()).replace(b'\n', b'\n  '))
+            f.write(b',\n  "detailed_results": [')
+            for i, result in enumerate(self.results):
+                f.write(b',\n    ' if i else b'\n    ')
+                f.write(self._dumps(result).replace(b'\n', b'\n    '))
+            f.write(b'\n  ]\n}' if self.results else b']\n}')
 
         print(f"\nResults saved to: {filepath}")
 
@@ -363,24 +648,29 @@ class ModelComparator:
 
         print(f"\nTotal Queries: {summary['total_queries']}")
         print(f"\nModel Performance:")
-        print("-"*100)
-        print(f"{'Model':<30} {'Accuracy':<12} {'Success':<10} {'Avg Time':<12} {'Avg Words':<12}")
-        print("-"*100)
-
-        for model_key, stats in summary["models"].items():
-            # Get model display name from MODELS dict
-            model_info = self.MODELS.get(model_key, {})
-            display_name = model_info.get("name", model_key)[:28]
-
-            print(f"{display_name:<30} "
-                  f"{stats['accuracy']*100:>6.1f}%     "
-                  f"{stats['success_rate']*100:>6.1f}%   "
-                  f"{stats['avg_response_time']:>8.2f}s    "
-                  f"{stats['avg_word_count']:>8.1f}")
-
-        print("-"*100)
+
+        rule = "-"*100
+        rows = [rule, f"{'Model':<30} {'Accuracy':<12} {'Success':<10} {'Avg Time':<12} {'Avg Words':<12} {'Cached':<8}", rule]
+
+        # Best model first
+        ranked = sorted(summary["models"].items(), key=lambda item: item[1]["accuracy"], reverse=True)
+        for model_key, stats in ranked:
+            rows.append(self._SUMMARY_ROW.format(
+                # Get model display name from MODELS dict
+                name=self._DISPLAY_NAMES.get(model_key, model_key)[:28],
+                accuracy=stats['accuracy']*100,
+                success=stats['success_rate']*100,
+                # No live timing when every answer came from the cache
+                time="-" if stats['avg_response_time'] is None else f"{stats['avg_response_time']:.2f}s",
+                words=stats['avg_word_count'],
+                cached=stats['cache_hit_rate']*100
+            ))
+
+        rows.append(rule)
+        sys.stdout.write("\n".join(rows) + "\n")
         print(f"\nNote: Accuracy shows correct answers vs. test_results_final.json")
         print(f"      Success shows queries that completed without errors")
+        print(f"      Cached shows answers reused from the answer cache (not in Avg Time)")
 
 
 # Test the comparator
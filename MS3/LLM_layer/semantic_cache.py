@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache - Reuses answers for queries that mean the same thing
+"""
+import json
+import time
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-process cache keyed by normalized query embeddings.
+
+    A lookup is a single matrix-vector product against every stored
+    embedding; if the best cosine similarity reaches the threshold, the
+    stored value is returned. Least recently used entries are evicted once
+    the cache is full, and entries older than the TTL (if set) expire.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 10000, ttl: float = None):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_size: Maximum number of entries before LRU eviction
+            ttl: Seconds an entry stays valid (None: no expiry)
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._embs = None  # float32 matrix [capacity, dim], grown on demand
+        self._vals = []
+        self._last_used = []
+        self._stored_at = []
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._vals)
+
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """
+        Look up the value stored for the most similar query.
+
+        Args:
+            embedding: L2-normalized query embedding
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            if not self._vals:
+                return None
+
+            sims = self._embs[:len(self._vals)] @ embedding
+
+            if self.ttl is not None:
+                expired = np.flatnonzero(time.monotonic() - np.asarray(self._stored_at) > self.ttl)
+                if len(expired):
+                    # Blank expired slots so they never match again and are
+                    # the first to be reused once the cache is full
+                    self._embs[expired] = 0.0
+                    sims[expired] = -np.inf
+                    for slot in expired:
+                        self._vals[slot] = None
+                        self._last_used[slot] = 0
+
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+
+            self._tick += 1
+            self._last_used[best] = self._tick
+            return self._vals[best]
+
+    def put(self, embedding: np.ndarray, value: Any):
+        """
+        Store a value under a query embedding.
+
+        Args:
+            embedding: L2-normalized query embedding
+            value: Value to return for similar queries
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+
+        with self._lock:
+            self._tick += 1
+            size = len(self._vals)
+
+            if size >= self.max_size:
+                # Overwrite the least recently used slot
+                slot = int(np.argmin(self._last_used))
+                self._embs[slot] = embedding
+                self._vals[slot] = value
+                self._last_used[slot] = self._tick
+                self._stored_at[slot] = time.monotonic()
+                return
+
+            if self._embs is None:
+                self._embs = np.empty((16, embedding.shape[0]), dtype=np.float32)
+            elif size == self._embs.shape[0]:
+                # Double the capacity so appends stay amortized O(1)
+                grown = np.empty((min(size * 2, self.max_size), self._embs.shape[1]), dtype=np.float32)
+                grown[:size] = self._embs
+                self._embs = grown
+
+            self._embs[size] = embedding
+            self._vals.append(value)
+            self._last_used.append(self._tick)
+            self._stored_at.append(time.monotonic())
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._embs = None
+            self._vals = []
+            self._last_used = []
+            self._stored_at = []
+
+    def save(self, path: str):
+        """
+        Write the entries to an .npz file (values must be JSON-serializable).
+
+        Args:
+            path: Output file path
+        """
+        with self._lock:
+            live = [i for i, value in enumerate(self._vals) if value is not None]  # skip expired slots
+            embs = self._embs[live] if live else np.empty((0, 0), dtype=np.float32)
+            vals = json.dumps([self._vals[i] for i in live], ensure_ascii=False, default=str)
+
+        with open(path, 'wb') as f:
+            np.savez(f, embs=embs, vals=np.array(vals))
+
+    def load(self, path: str):
+        """
+        Add the entries from a file written by save().
+
+        Args:
+            path: Input file path
+        """
+        with np.load(path) as data:
+            embs = data["embs"]
+            vals = json.loads(str(data["vals"]))
+
+        for embedding, value in zip(embs, vals):
+            self.put(embedding, value)
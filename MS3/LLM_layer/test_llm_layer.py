@@ -14,6 +14,9 @@ from MS3.LLM_layer.llm_handler import LLMHandler
 from MS3.LLM_layer.model_comparison import ModelComparator
 from MS3.LLM_layer.evaluation import EvaluationMetrics
 
+# Lines of the Cypher queries that follow each question in ten_q.txt
+_CYPHER_PREFIXES = ("MATCH", "WITH", "WHERE", "RETURN", "ORDER", "LIMIT", "OPTIONAL")
+
 
 def load_test_questions(filepath: str = "../ten_q.txt") -> list:
     """
@@ -30,14 +33,13 @@ def load_test_questions(filepath: str = "../ten_q.txt") -> list:
     full_path = os.path.join(os.path.dirname(__file__), filepath)
 
     with open(full_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+        lines = f.read().splitlines()
 
-    current_question = ""
     for line in lines:
         line = line.strip()
 
         # Skip empty lines and Cypher queries
-        if not line or line.startswith("MATCH") or line.startswith("WITH") or line.startswith("WHERE") or line.startswith("RETURN") or line.startswith("ORDER") or line.startswith("LIMIT") or line.startswith("OPTIONAL"):
+        if not line or line.startswith(_CYPHER_PREFIXES):
             continue
 
         # Check if it's a question line
@@ -82,8 +84,13 @@ def test_single_query():
     return result
 
 
-def test_model_comparison():
-    """Test model comparison with multiple queries."""
+def test_model_comparison(max_concurrency: int = 8):
+    """
+    Test model comparison with multiple queries.
+
+    Args:
+        max_concurrency: Most (query, model) calls in flight at once
+    """
     print("\n" + "="*80)
     print("TEST 2: Model Comparison Test")
     print("="*80)
@@ -103,9 +110,14 @@ def test_model_comparison():
 
     print(f"\nTesting {len(test_questions)} questions across {len(models_to_test)} models")
     print(f"Models: {models_to_test}")
+    print(f"Concurrency: {max_concurrency}")
+
+    # Run comparison (calls run concurrently, bounded by max_concurrency)
+    comparator = ModelComparator(max_concurrency=max_concurrency)
 
-    # Run comparison
-    comparator = ModelComparator()
+    # Embed every question in one batch up front; each (query, model) call
+    # then finds its embedding in the handler's cache
+    comparator.handler.prewarm_embeddings(test_questions)
     results = comparator.run_batch_comparison(test_questions, models_to_test, use_embeddings=True)
 
     # Print summary
@@ -171,7 +183,7 @@ def test_baseline_vs_embedding():
     print(f"Combined - Answer length: {len(result_combined['answer'])}")
 
 
-def run_all_tests():
+def run_all_tests(max_concurrency: int = 8):
     """Run all test scenarios."""
     print("\n" + "#"*80)
     print("# LLM LAYER COMPREHENSIVE TEST SUITE")
@@ -182,7 +194,7 @@ def run_all_tests():
         test_single_query()
 
         # Test 2: Model comparison
-        comparator, results = test_model_comparison()
+        comparator, results = test_model_comparison(max_concurrency)
 
         # Test 3: Evaluation
         test_evaluation(comparator, results)
@@ -218,7 +230,7 @@ def interactive_mode():
         try:
             result = handler.generate_answer(query)
 
-            print("\n--- Answer ---")
+            print("\n--- Answer (semantic cache hit) ---" if result.get("cache_hit") else "\n--- Answer ---")
             print(result['answer'])
 
             # Ask if user wants to see details
@@ -237,15 +249,17 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test LLM Layer")
     parser.add_argument("--test", choices=["single", "comparison", "all", "interactive"],
                        default="all", help="Which test to run")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Concurrent model calls in the comparison test (keep under the Groq rate limit)")
 
     args = parser.parse_args()
 
     if args.test == "single":
         test_single_query()
     elif args.test == "comparison":
-        comparator, results = test_model_comparison()
+        comparator, results = test_model_comparison(args.concurrency)
         test_evaluation(comparator, results)
     elif args.test == "interactive":
         interactive_mode()
     else:
-        run_all_tests()
\ No newline at end of file
+        run_all_tests(args.concurrency)
\ No newline at end of file
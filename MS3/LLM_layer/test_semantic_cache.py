@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Semantic Cache
+Checks threshold hits and misses, TTL expiry, LRU eviction and save/load
+(no Neo4j, embedding model or LLM needed)
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from MS3.LLM_layer.semantic_cache import SemanticCache
+
+
+def unit(*components) -> np.ndarray:
+    """L2-normalized float32 vector, like the query embeddings the cache stores"""
+    vector = np.array(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def near(cosine: float) -> np.ndarray:
+    """Unit vector whose cosine similarity with unit(1, 0, 0) is `cosine`"""
+    return unit(cosine, np.sqrt(1 - cosine ** 2), 0)
+
+
+def test_threshold():
+    """A query hits at or above the threshold and misses below it."""
+    print("TEST 1: Threshold")
+    cache = SemanticCache(threshold=0.9)
+    assert cache.get(unit(1, 0, 0)) is None  # Empty cache
+
+    cache.put(unit(1, 0, 0), "answer")
+    assert cache.get(unit(1, 0, 0)) == "answer"
+    assert cache.get(near(0.95)) == "answer"
+    assert cache.get(near(0.85)) is None
+    print("✓ hit at 0.95, miss at 0.85 (threshold 0.9)")
+
+
+def test_ttl_expiry():
+    """Expired entries never hit, and do not hide a fresh second-best entry."""
+    print("TEST 2: TTL expiry")
+    cache = SemanticCache(threshold=0.9, ttl=0.05)
+    cache.put(unit(1, 0, 0), "old")
+    time.sleep(0.1)
+    cache.put(near(0.95), "fresh")
+
+    # The exact match has expired; the fresh neighbour is still above threshold
+    assert cache.get(unit(1, 0, 0)) == "fresh"
+
+    time.sleep(0.1)
+    assert cache.get(unit(1, 0, 0)) is None
+    assert cache.get(near(0.95)) is None
+    print("✓ expired entries skipped, then everything expired")
+
+
+def test_lru_eviction():
+    """A full cache overwrites the least recently used entry."""
+    print("TEST 3: LRU eviction")
+    cache = SemanticCache(threshold=0.9, max_size=2)
+    cache.put(unit(1, 0, 0), "a")
+    cache.put(unit(0, 1, 0), "b")
+    assert cache.get(unit(1, 0, 0)) == "a"  # "b" is now least recently used
+
+    cache.put(unit(0, 0, 1), "c")
+    assert len(cache) == 2
+    assert cache.get(unit(0, 1, 0)) is None
+    assert cache.get(unit(1, 0, 0)) == "a"
+    assert cache.get(unit(0, 0, 1)) == "c"
+    print("✓ least recently used entry evicted")
+
+
+def test_save_load():
+    """Entries survive a save/load round trip; expired ones are not saved."""
+    print("TEST 4: Save and load")
+    cache = SemanticCache(threshold=0.9, ttl=0.05)
+    cache.put(unit(0, 0, 1), "expired")
+    time.sleep(0.1)
+    cache.get(unit(0, 0, 1))  # Blanks the expired slot
+    cache.put(unit(1, 0, 0), {"answer": "a", "rows": [1, 2]})
+    cache.put(unit(0, 1, 0), "b")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.npz")
+        cache.save(path)
+
+        loaded = SemanticCache(threshold=0.9)
+        loaded.load(path)
+
+    assert len(loaded) == 2
+    assert loaded.get(unit(1, 0, 0)) == {"answer": "a", "rows": [1, 2]}
+    assert loaded.get(near(0.95)) == {"answer": "a", "rows": [1, 2]}
+    assert loaded.get(unit(0, 1, 0)) == "b"
+    assert loaded.get(unit(0, 0, 1)) is None
+    print("✓ round trip kept 2 live entries, dropped the expired one")
+
+
+def run_all_tests():
+    """Run every semantic cache test."""
+    print("="*80)
+    print("SEMANTIC CACHE TESTS")
+    print("="*80)
+
+    test_threshold()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_save_load()
+
+    print("\n✓ All semantic cache tests passed")
+
+
+if __name__ == "__main__":
+    run_all_tests()
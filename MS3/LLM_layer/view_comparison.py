@@ -6,12 +6,17 @@ Displays comparison results from model_comparison.py in an interactive dashboard
 import streamlit as st
 import json
 import os
+import re
+import hashlib
 from datetime import datetime
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from glob import glob
-from evaluation import EvaluationMetrics
+from glob import glob, escape as glob_escape
+
+from cache_paths import cache_dir
+
+try:
+    import orjson  # Optional: faster parsing of large result files
+except ImportError:
+    orjson = None
 
 # Page config
 st.set_page_config(
@@ -38,11 +43,50 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_comparison_results(filepath):
-    """Load comparison results from JSON file"""
+@st.cache_resource(max_entries=8)
+def load_comparison_results(filepath, mtime=None):
+    """
+    Load comparison results from JSON file.
+
+    Cached per (filepath, mtime) and shared across reruns and sessions
+    without being copied, so pass os.path.getmtime(filepath) to pick up a
+    rewritten file. The returned data must not be modified.
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+# Start of a results file written by ModelComparator.save_results(), up to the summary
+_SUMMARY_HEAD = re.compile(r'\s*\{\s*"summary"\s*:\s*')
+
+@st.cache_resource(max_entries=8)
+def load_summary(filepath, mtime=None):
+    """
+    Load only the summary of a comparison results file.
+
+    save_results() writes the summary first, so it is decoded from the head
+    of the file without parsing the much larger detailed_results; files
+    laid out differently fall back to a full load.
+    """
+    decoder = json.JSONDecoder()
     with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        head = f.read(1 << 16)
+        match = _SUMMARY_HEAD.match(head)
+        while match:
+            try:
+                return decoder.raw_decode(head, match.end())[0]
+            except json.JSONDecodeError:
+                chunk = f.read(1 << 16)
+                if not chunk:
+                    break
+                head += chunk
+    return load_comparison_results(filepath, mtime).get("summary", {})
+
+class _ModelDisplayNames(dict):
+    """Short display name (after the provider prefix) per model ID, computed once"""
+    def __missing__(self, model_id):
+        name = self[model_id] = model_id.rsplit('/', 1)[-1]
+        return name
 
 def get_available_result_files():
     """Get list of available comparison result files"""
@@ -63,83 +107,91 @@ def format_model_name(model_id, models_dict):
         return models_dict[model_id].get("name", model_id)
     return model_id
 
-def calculate_quantitative_metrics(detailed_results):
-    """Calculate quantitative metrics for all models from detailed results"""
-    evaluator = EvaluationMetrics()
-    model_metrics = {}
-
-    for query_result in detailed_results:
-        query = query_result.get('query', '')
-        for model_id, model_result in query_result.get('models', {}).items():
-            if model_id not in model_metrics:
-                model_metrics[model_id] = []
-
-            if model_result.get('answer') and not model_result.get('error'):
-                # Create result dict for evaluation
-                eval_result = {
-                    "answer": model_result['answer'],
-                    "context": "",  # Context not stored in comparison results
-                    "query": query,
-                    "response_time": model_result.get('response_time', 0),
-                    "baseline_results": {"results": []},
-                    "embedding_results": {"results": []}
-                }
-
-                quant_metrics = evaluator.evaluate_quantitative(eval_result)
-                model_metrics[model_id].append(quant_metrics)
-
-    # Aggregate metrics per model
-    aggregated = {}
-    for model_id, metrics_list in model_metrics.items():
-        if metrics_list:
-            aggregated[model_id] = {
-                'avg_response_time': sum(m['response_time'] for m in metrics_list) / len(metrics_list),
-                'avg_word_count': sum(m['word_count'] for m in metrics_list) / len(metrics_list),
-                'avg_sentence_count': sum(m['sentence_count'] for m in metrics_list) / len(metrics_list),
-                'avg_answer_length': sum(m['answer_length'] for m in metrics_list) / len(metrics_list),
-                'total_queries': len(metrics_list)
-            }
-
-    return aggregated
-
-def calculate_qualitative_metrics(detailed_results):
-    """Calculate qualitative metrics for all models from detailed results"""
-    evaluator = EvaluationMetrics()
-    model_metrics = {}
-
-    for query_result in detailed_results:
-        query = query_result.get('query', '')
-        for model_id, model_result in query_result.get('models', {}).items():
-            if model_id not in model_metrics:
-                model_metrics[model_id] = []
-
-            if model_result.get('answer') and not model_result.get('error'):
-                # Create result dict for evaluation
-                eval_result = {
-                    "answer": model_result['answer'],
-                    "context": "",  # Context not stored in comparison results
-                    "query": query,
-                    "response_time": model_result.get('response_time', 0)
-                }
-
-                qual_metrics = evaluator.evaluate_qualitative(eval_result)
-                model_metrics[model_id].append(qual_metrics)
-
-    # Aggregate metrics per model
-    aggregated = {}
-    for model_id, metrics_list in model_metrics.items():
-        if metrics_list:
-            aggregated[model_id] = {
-                'avg_relevance': sum(m['relevance'] for m in metrics_list) / len(metrics_list),
-                # 'avg_factual_grounding': sum(m['factual_grounding'] for m in metrics_list) / len(metrics_list),
-                'avg_completeness': sum(m['completeness'] for m in metrics_list) / len(metrics_list),
-                'avg_clarity': sum(m['clarity'] for m in metrics_list) / len(metrics_list),
-                'avg_no_hallucination': sum(m['no_hallucination'] for m in metrics_list) / len(metrics_list),
-                'overall_qualitative': sum(m['overall_qualitative'] for m in metrics_list) / len(metrics_list),
-                'total_queries': len(metrics_list)
-            }
-
-    return aggregated
+# Bump when the metric definitions change, so stored metrics are recomputed
+METRICS_VERSION = 2
+
+@st.cache_resource(max_entries=8)
+def file_digest(filepath, mtime=None):
+    """Short SHA-256 of a file's content (cached per (filepath, mtime))"""
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+@st.cache_data(max_entries=8)
+def load_metrics(filepath, digest):
+    """
+    Quantitative and qualitative metrics for a results file.
+
+    They only depend on the file's content, so they are stored in the user
+    cache directory as <file name>.<digest>-v<METRICS_VERSION>.metrics.json
+    and recomputed only when the content (or METRICS_VERSION) changes.
+    """
+    metrics_dir = cache_dir("comparison_metrics")
+    name = os.path.basename(filepath)
+    cache_path = os.path.join(metrics_dir, f"{name}.{digest}-v{METRICS_VERSION}.metrics.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # Only needed on a miss, so the evaluator is not imported on page load
+    from view_comparison_metrics import calculate_metrics
+
+    detailed = load_comparison_results(filepath, os.path.getmtime(filepath)).get("detailed_results", [])
+    quantitative, qualitative = calculate_metrics(detailed)
+    metrics = {"quantitative": quantitative, "qualitative": qualitative}
+
+    try:
+        # Drop metrics stored for older content of this file
+        for stale in glob(os.path.join(glob_escape(metrics_dir), glob_escape(name) + ".*.metrics.json")):
+            os.remove(stale)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f)
+    except OSError:
+        pass  # Unwritable cache directory; recompute next time
+
+    return metrics
+
+def bar_chart(df, column, title, colorscale, texttemplate):
+    """
+    Horizontal bar chart of one column per model, largest value on top.
+
+    Built with graph_objects straight from the column's numpy array,
+    which skips plotly.express's per-chart reshaping and type inference.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    values = df[column].to_numpy(dtype=float)
+    order = np.argsort(values, kind="stable")
+    values = values[order]
+
+    fig = go.Figure(go.Bar(
+        x=values,
+        y=df["Model"].to_numpy()[order],
+        orientation='h',
+        marker=dict(color=values, colorscale=colorscale, colorbar=dict(title=column)),
+        text=values,
+        texttemplate=texttemplate,
+        textposition='outside',
+        hovertemplate=f"{column}={texttemplate.replace('%{text', '%{x')}<br>Model=%{{y}}<extra></extra>"
+    ))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title="Model", height=400, showlegend=False)
+    return fig
+
+def compact_dtypes(df):
+    """
+    Categorical model names and float32 metrics.
+
+    The tables and charts are re-sent to the browser on every rerun, and
+    the values are only shown rounded to 1-2 decimals, so the smaller
+    dtypes lose nothing visible (display formats are set explicitly).
+    """
+    df = df.astype({column: "float32" for column in df.select_dtypes("float64").columns})
+    if "Model" in df:
+        df["Model"] = df["Model"].astype("category")
+    return df
 
 # Header
 st.title("📊 Model Comparison Dashboard")
@@ -170,10 +222,11 @@ with st.sidebar:
 
     result_file = file_options[selected_file]
 
-# Load data
-data = load_comparison_results(result_file)
-summary = data.get("summary", {})
-detailed_results = data.get("detailed_results", [])
+# Load data (the detailed results are only parsed when they are needed)
+result_mtime = os.path.getmtime(result_file)
+summary = load_summary(result_file, result_mtime)
+
+model_display = _ModelDisplayNames()
 
 # Display timestamp
 if "timestamp" in summary:
@@ -186,24 +239,29 @@ st.divider()
 # ==========================================
 st.header("🏆 Model Leaderboard")
 
-# Create summary dataframe
-models_data = []
-for model_id, stats in summary.get("models", {}).items():
-    models_data.append({
-        "Model": model_id.split('/')[-1] if '/' in model_id else model_id,
-        "Full ID": model_id,
-        "Accuracy (%)": round(stats.get("accuracy", 0) * 100, 1),
-        "Correct": stats.get("correct_count", 0),
-        "Total": stats.get("queries_with_expected", 0),
-        # "Success Rate (%)": round(stats.get("success_rate", 0) * 100, 1),
-        "Avg Response Time (s)": round(stats.get("avg_response_time", 0), 2),
-        "Avg Word Count": round(stats.get("avg_word_count", 0), 1),
-    })
-
-df_summary = pd.DataFrame(models_data)
+# Imported here rather than at the top so the title, file selector and
+# caption render before the heavy libraries finish loading
+import pandas as pd
+
+# Create summary dataframe, one column at a time over all models
+summary_models = summary.get("models", {})
+stats = pd.json_normalize(list(summary_models.values())).reindex(
+    columns=["accuracy", "correct_count", "queries_with_expected", "avg_response_time", "avg_word_count"])
+
+df_summary = pd.DataFrame({
+    "Model": [model_display[model_id] for model_id in summary_models],
+    "Full ID": list(summary_models),
+    "Accuracy (%)": (stats["accuracy"].fillna(0) * 100).round(1),
+    "Correct": stats["correct_count"].fillna(0).astype(int),
+    "Total": stats["queries_with_expected"].fillna(0).astype(int),
+    # "Success Rate (%)": (stats["success_rate"].fillna(0) * 100).round(1),
+    # Empty when every answer came from the answer cache
+    "Avg Response Time (s)": stats["avg_response_time"].astype(float).round(2),
+    "Avg Word Count": stats["avg_word_count"].fillna(0).round(1),
+})
 
 # Sort by accuracy
-df_summary = df_summary.sort_values("Accuracy (%)", ascending=False)
+df_summary = compact_dtypes(df_summary.sort_values("Accuracy (%)", ascending=False, ignore_index=True))
 
 # Display summary table
 st.dataframe(
@@ -216,7 +274,9 @@ st.dataframe(
             format="%.1f%%",
             min_value=0,
             max_value=100,
-        )
+        ),
+        "Avg Response Time (s)": st.column_config.NumberColumn(format="%.2f"),
+        "Avg Word Count": st.column_config.NumberColumn(format="%.1f")
         # ,
         # "Success Rate (%)": st.column_config.ProgressColumn(
         #     "Success Rate (%)",
@@ -237,56 +297,55 @@ st.divider()
 # ==========================================
 st.header("📈 Performance Visualizations")
 
+import plotly.graph_objects as go
+
 col1, col2 = st.columns(2)
 
 with col1:
     # Accuracy comparison chart
-    fig_accuracy = px.bar(
-        df_summary.sort_values("Accuracy (%)", ascending=True),
-        x="Accuracy (%)",
-        y="Model",
-        orientation='h',
-        title="Model Accuracy Comparison",
-        color="Accuracy (%)",
-        color_continuous_scale="Viridis",
-        text="Accuracy (%)"
-    )
-    fig_accuracy.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-    fig_accuracy.update_layout(height=400, showlegend=False)
+    fig_accuracy = bar_chart(df_summary, "Accuracy (%)", "Model Accuracy Comparison",
+                             colorscale="Viridis", texttemplate='%{text:.1f}%')
     st.plotly_chart(fig_accuracy, use_container_width=True)
 
 with col2:
     # Response time comparison
-    fig_time = px.bar(
-        df_summary.sort_values("Avg Response Time (s)"),
-        x="Avg Response Time (s)",
-        y="Model",
-        orientation='h',
-        title="Average Response Time Comparison",
-        color="Avg Response Time (s)",
-        color_continuous_scale="Reds_r",
-        text="Avg Response Time (s)"
-    )
-    fig_time.update_traces(texttemplate='%{text:.2f}s', textposition='outside')
-    fig_time.update_layout(height=400, showlegend=False)
+    fig_time = bar_chart(df_summary, "Avg Response Time (s)", "Average Response Time Comparison",
+                         colorscale="Reds_r", texttemplate='%{text:.2f}s')
     st.plotly_chart(fig_time, use_container_width=True)
 
 # Performance scatter plot
 st.subheader("⚡ Accuracy vs Speed")
-fig_scatter = px.scatter(
-    df_summary,
-    x="Avg Response Time (s)",
-    y="Accuracy (%)",
-    size="Avg Word Count",
-    color="Model",
-    hover_data=["Full ID", "Correct", "Total"],
+sizes = df_summary["Avg Word Count"].to_numpy(dtype=float)
+# Bubble area scaled like plotly.express's default (largest bubble 20px across)
+sizeref = sizes.max(initial=0) / 20 ** 2 or 1
+
+fig_scatter = go.Figure()
+for model, full_id, response_time, accuracy, size, correct, total in zip(
+        df_summary["Model"].to_numpy(),
+        df_summary["Full ID"].to_numpy(),
+        df_summary["Avg Response Time (s)"].to_numpy(dtype=float),
+        df_summary["Accuracy (%)"].to_numpy(dtype=float),
+        sizes,
+        df_summary["Correct"].to_numpy(),
+        df_summary["Total"].to_numpy()):
+    fig_scatter.add_trace(go.Scatter(
+        x=[response_time],
+        y=[accuracy],
+        mode='markers',
+        name=model,
+        marker=dict(size=[size], sizemode='area', sizeref=sizeref),
+        customdata=[[full_id, correct, total]],
+        hovertemplate=(f"Model={model}<br>Average Response Time (seconds)=%{{x:.2f}}<br>Accuracy (%)=%{{y:.1f}}"
+                       "<br>Avg Word Count=%{marker.size:.1f}<br>Full ID=%{customdata[0]}"
+                       "<br>Correct=%{customdata[1]}<br>Total=%{customdata[2]}<extra></extra>")
+    ))
+fig_scatter.update_layout(
     title="Model Performance: Accuracy vs Response Time (bubble size = avg word count)",
-    labels={
-        "Avg Response Time (s)": "Average Response Time (seconds)",
-        "Accuracy (%)": "Accuracy (%)"
-    }
+    xaxis_title="Average Response Time (seconds)",
+    yaxis_title="Accuracy (%)",
+    legend_title_text="Model",
+    height=500
 )
-fig_scatter.update_layout(height=500)
 st.plotly_chart(fig_scatter, use_container_width=True)
 
 st.divider()
@@ -296,15 +355,17 @@ st.divider()
 # ==========================================
 st.header("📏 Quantitative Metrics Analysis")
 
+results_digest = file_digest(result_file, result_mtime)
+
 with st.spinner("Calculating quantitative metrics..."):
-    quant_metrics = calculate_quantitative_metrics(detailed_results)
+    quant_metrics = load_metrics(result_file, results_digest)["quantitative"]
 
 if quant_metrics:
     # Create dataframe for quantitative metrics
     quant_data = []
     for model_id, metrics in quant_metrics.items():
         quant_data.append({
-            "Model": model_id.split('/')[-1] if '/' in model_id else model_id,
+            "Model": model_display[model_id],
             "Full ID": model_id,
             "Avg Response Time (s)": round(metrics['avg_response_time'], 2),
             "Avg Word Count": round(metrics['avg_word_count'], 1),
@@ -313,13 +374,19 @@ if quant_metrics:
             "Total Queries": metrics['total_queries']
         })
 
-    df_quant = pd.DataFrame(quant_data)
+    df_quant = compact_dtypes(pd.DataFrame(quant_data))
 
     st.subheader("📊 Quantitative Metrics Table")
     st.dataframe(
         df_quant,
         use_container_width=True,
-        hide_index=True
+        hide_index=True,
+        column_config={
+            "Avg Response Time (s)": st.column_config.NumberColumn(format="%.2f"),
+            "Avg Word Count": st.column_config.NumberColumn(format="%.1f"),
+            "Avg Sentence Count": st.column_config.NumberColumn(format="%.1f"),
+            "Avg Answer Length": st.column_config.NumberColumn(format="%.0f"),
+        }
     )
 
     # Visualizations for quantitative metrics
@@ -327,34 +394,14 @@ if quant_metrics:
 
     with col1:
         # Word count comparison
-        fig_words = px.bar(
-            df_quant.sort_values("Avg Word Count", ascending=True),
-            x="Avg Word Count",
-            y="Model",
-            orientation='h',
-            title="Average Word Count by Model",
-            color="Avg Word Count",
-            color_continuous_scale="Blues",
-            text="Avg Word Count"
-        )
-        fig_words.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig_words.update_layout(height=400, showlegend=False)
+        fig_words = bar_chart(df_quant, "Avg Word Count", "Average Word Count by Model",
+                              colorscale="Blues", texttemplate='%{text:.1f}')
         st.plotly_chart(fig_words, use_container_width=True)
 
     with col2:
         # Sentence count comparison
-        fig_sentences = px.bar(
-            df_quant.sort_values("Avg Sentence Count", ascending=True),
-            x="Avg Sentence Count",
-            y="Model",
-            orientation='h',
-            title="Average Sentence Count by Model",
-            color="Avg Sentence Count",
-            color_continuous_scale="Greens",
-            text="Avg Sentence Count"
-        )
-        fig_sentences.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig_sentences.update_layout(height=400, showlegend=False)
+        fig_sentences = bar_chart(df_quant, "Avg Sentence Count", "Average Sentence Count by Model",
+                                  colorscale="Greens", texttemplate='%{text:.1f}')
         st.plotly_chart(fig_sentences, use_container_width=True)
 
 st.divider()
@@ -365,14 +412,14 @@ st.divider()
 st.header("🎯 Qualitative Metrics Analysis")
 
 with st.spinner("Calculating qualitative metrics..."):
-    qual_metrics = calculate_qualitative_metrics(detailed_results)
+    qual_metrics = load_metrics(result_file, results_digest)["qualitative"]
 
 if qual_metrics:
     # Create dataframe for qualitative metrics
     qual_data = []
     for model_id, metrics in qual_metrics.items():
         qual_data.append({
-            "Model": model_id.split('/')[-1] if '/' in model_id else model_id,
+            "Model": model_display[model_id],
             "Full ID": model_id,
             "Overall Quality (%)": round(metrics['overall_qualitative'] * 100, 1),
             "Relevance (%)": round(metrics['avg_relevance'] * 100, 1),
@@ -383,7 +430,7 @@ if qual_metrics:
             "Total Queries": metrics['total_queries']
         })
 
-    df_qual = pd.DataFrame(qual_data)
+    df_qual = compact_dtypes(pd.DataFrame(qual_data))
     df_qual = df_qual.sort_values("Overall Quality (%)", ascending=False)
 
     st.subheader("🏅 Qualitative Metrics Table")
@@ -410,6 +457,8 @@ if qual_metrics:
                 min_value=0,
                 max_value=100,
             ),
+            "Completeness (%)": st.column_config.NumberColumn(format="%.1f"),
+            "No Hallucination (%)": st.column_config.NumberColumn(format="%.1f"),
         }
     )
 
@@ -421,7 +470,7 @@ if qual_metrics:
     categories = ['Relevance',  'Completeness', 'Clarity', 'No Hallucination']
 
     for model_id, metrics in qual_metrics.items():
-        model_name = model_id.split('/')[-1] if '/' in model_id else model_id
+        model_name = model_display[model_id]
         values = [
             metrics['avg_relevance'] * 100,
             # metrics['avg_factual_grounding'] * 100,
@@ -457,48 +506,18 @@ if qual_metrics:
 
     with col1:
         # Relevance comparison
-        fig_rel = px.bar(
-            df_qual.sort_values("Relevance (%)", ascending=True),
-            x="Relevance (%)",
-            y="Model",
-            orientation='h',
-            title="Relevance Score by Model",
-            color="Relevance (%)",
-            color_continuous_scale="Viridis",
-            text="Relevance (%)"
-        )
-        fig_rel.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_rel.update_layout(height=400, showlegend=False)
+        fig_rel = bar_chart(df_qual, "Relevance (%)", "Relevance Score by Model",
+                            colorscale="Viridis", texttemplate='%{text:.1f}%')
         st.plotly_chart(fig_rel, use_container_width=True)
 
         # Completeness comparison
-        fig_comp = px.bar(
-            df_qual.sort_values("Completeness (%)", ascending=True),
-            x="Completeness (%)",
-            y="Model",
-            orientation='h',
-            title="Completeness Score by Model",
-            color="Completeness (%)",
-            color_continuous_scale="Teal",
-            text="Completeness (%)"
-        )
-        fig_comp.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_comp.update_layout(height=400, showlegend=False)
+        fig_comp = bar_chart(df_qual, "Completeness (%)", "Completeness Score by Model",
+                             colorscale="Teal", texttemplate='%{text:.1f}%')
         st.plotly_chart(fig_comp, use_container_width=True)
 
         # No Hallucination comparison
-        fig_hall = px.bar(
-            df_qual.sort_values("No Hallucination (%)", ascending=True),
-            x="No Hallucination (%)",
-            y="Model",
-            orientation='h',
-            title="No Hallucination Score by Model",
-            color="No Hallucination (%)",
-            color_continuous_scale="Purp",
-            text="No Hallucination (%)"
-        )
-        fig_hall.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_hall.update_layout(height=400, showlegend=False)
+        fig_hall = bar_chart(df_qual, "No Hallucination (%)", "No Hallucination Score by Model",
+                             colorscale="Purp", texttemplate='%{text:.1f}%')
         st.plotly_chart(fig_hall, use_container_width=True)
 
     with col2:
@@ -518,33 +537,13 @@ if qual_metrics:
         # st.plotly_chart(fig_ground, use_container_width=True)
 
         # Clarity comparison
-        fig_clar = px.bar(
-            df_qual.sort_values("Clarity (%)", ascending=True),
-            x="Clarity (%)",
-            y="Model",
-            orientation='h',
-            title="Clarity Score by Model",
-            color="Clarity (%)",
-            color_continuous_scale="Mint",
-            text="Clarity (%)"
-        )
-        fig_clar.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_clar.update_layout(height=400, showlegend=False)
+        fig_clar = bar_chart(df_qual, "Clarity (%)", "Clarity Score by Model",
+                             colorscale="Mint", texttemplate='%{text:.1f}%')
         st.plotly_chart(fig_clar, use_container_width=True)
 
         # Overall Quality comparison
-        fig_overall = px.bar(
-            df_qual.sort_values("Overall Quality (%)", ascending=True),
-            x="Overall Quality (%)",
-            y="Model",
-            orientation='h',
-            title="Overall Quality Score by Model",
-            color="Overall Quality (%)",
-            color_continuous_scale="RdYlGn",
-            text="Overall Quality (%)"
-        )
-        fig_overall.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_overall.update_layout(height=400, showlegend=False)
+        fig_overall = bar_chart(df_qual, "Overall Quality (%)", "Overall Quality Score by Model",
+                                colorscale="RdYlGn", texttemplate='%{text:.1f}%')
         st.plotly_chart(fig_overall, use_container_width=True)
 
 st.divider()
@@ -554,69 +553,81 @@ st.divider()
 # ==========================================
 st.header("🔍 Detailed Query Results")
 
-if detailed_results:
-    # Query selector
-    query_options = {f"Q{i+1}: {result['query'][:80]}..." if len(result['query']) > 80 else f"Q{i+1}: {result['query']}": i
-                     for i, result in enumerate(detailed_results)}
-
-    selected_query = st.selectbox(
-        "Select a query to view details",
-        options=list(query_options.keys())
-    )
-
-    query_idx = query_options[selected_query]
-    query_result = detailed_results[query_idx]
-
-    st.subheader("Query")
-    st.info(query_result['query'])
-
-    # Model responses for this query
-    st.subheader("Model Responses")
+if not st.toggle("Show detailed query results", help="Parses the full results file"):
+    st.caption("Turn on to browse every model's answer per query.")
+else:
+    detailed_results = load_comparison_results(result_file, result_mtime).get("detailed_results", [])
 
-    query_models_data = []
-    for model_id, model_result in query_result.get("models", {}).items():
-        accuracy_check = model_result.get("accuracy_check", {})
+    if detailed_results:
+        # Query selector
+        query_options = {f"Q{i+1}: {result['query'][:80]}..." if len(result['query']) > 80 else f"Q{i+1}: {result['query']}": i
+                         for i, result in enumerate(detailed_results)}
 
-        query_models_data.append({
-            "Model": model_id.split('/')[-1] if '/' in model_id else model_id,
-            "Correct": "✓" if model_result.get("correct", False) else "✗",
-            "Response Time (s)": round(model_result.get("response_time", 0), 2),
-            "Word Count": model_result.get("word_count", 0),
-            "Intent Match": "✓" if accuracy_check.get("intent_match", False) else "✗",
-            "Expected Intent": accuracy_check.get("expected_intent", "N/A"),
-            "Actual Intent": accuracy_check.get("actual_intent", "N/A"),
-        })
+        selected_query = st.selectbox(
+            "Select a query to view details",
+            options=list(query_options.keys())
+        )
 
-    df_query = pd.DataFrame(query_models_data)
-    st.dataframe(df_query, use_container_width=True, hide_index=True)
-
-    # Show actual answers in expandable sections
-    st.subheader("Model Answers")
-
-    for model_id, model_result in query_result.get("models", {}).items():
-        model_name = model_id.split('/')[-1] if '/' in model_id else model_id
-        correct_indicator = "✓" if model_result.get("correct", False) else "✗"
-
-        with st.expander(f"{correct_indicator} {model_name} - {model_result.get('word_count', 0)} words, {model_result.get('response_time', 0):.2f}s"):
-            if model_result.get("error"):
-                st.error(f"Error: {model_result['error']}")
-            else:
-                st.markdown(model_result.get("answer", "No answer"))
-
-                # Show accuracy check details
-                if model_result.get("accuracy_check", {}).get("has_expected"):
-                    st.caption("**Accuracy Details:**")
-                    acc = model_result["accuracy_check"]
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Intent Match", "Yes" if acc.get("intent_match") else "No")
-                    with col2:
-                        st.metric("Expected Results", acc.get("expected_result_count", 0))
-                    with col3:
-                        st.metric("Actual Results", acc.get("actual_result_count", 0))
+        query_idx = query_options[selected_query]
+        query_result = detailed_results[query_idx]
+
+        st.subheader("Query")
+        st.info(query_result['query'])
+
+        # Model responses for this query
+        st.subheader("Model Responses")
+
+        query_models_data = []
+        for model_id, model_result in query_result.get("models", {}).items():
+            accuracy_check = model_result.get("accuracy_check", {})
+
+            query_models_data.append({
+                "Model": model_display[model_id],
+                "Correct": "✓" if model_result.get("correct", False) else "✗",
+                "Response Time (s)": round(model_result.get("response_time") or 0, 2),
+                "Word Count": model_result.get("word_count", 0),
+                "Intent Match": "✓" if accuracy_check.get("intent_match", False) else "✗",
+                "Expected Intent": accuracy_check.get("expected_intent", "N/A"),
+                "Actual Intent": accuracy_check.get("actual_intent", "N/A"),
+            })
+
+        df_query = compact_dtypes(pd.DataFrame(query_models_data))
+        st.dataframe(
+            df_query,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Response Time (s)": st.column_config.NumberColumn(format="%.2f"),
+            }
+        )
 
-else:
-    st.warning("No detailed results available")
+        # Show actual answers in expandable sections
+        st.subheader("Model Answers")
+
+        for model_id, model_result in query_result.get("models", {}).items():
+            model_name = model_display[model_id]
+            correct_indicator = "✓" if model_result.get("correct", False) else "✗"
+
+            with st.expander(f"{correct_indicator} {model_name} - {model_result.get('word_count', 0)} words, {model_result.get('response_time') or 0:.2f}s"):
+                if model_result.get("error"):
+                    st.error(f"Error: {model_result['error']}")
+                else:
+                    st.markdown(model_result.get("answer", "No answer"))
+
+                    # Show accuracy check details
+                    if model_result.get("accuracy_check", {}).get("has_expected"):
+                        st.caption("**Accuracy Details:**")
+                        acc = model_result["accuracy_check"]
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Intent Match", "Yes" if acc.get("intent_match") else "No")
+                        with col2:
+                            st.metric("Expected Results", acc.get("expected_result_count", 0))
+                        with col3:
+                            st.metric("Actual Results", acc.get("actual_result_count", 0))
+
+    else:
+        st.warning("No detailed results available")
 
 # Footer
 st.divider()
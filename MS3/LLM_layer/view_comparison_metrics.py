@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Metric calculators for the Model Comparison Results Viewer
+Aggregates EvaluationMetrics scores per model from comparison results
+"""
+from functools import lru_cache
+
+import pandas as pd
+
+from evaluation import EvaluationMetrics
+
+
+@lru_cache(maxsize=None)
+def get_evaluator() -> EvaluationMetrics:
+    """
+    The shared EvaluationMetrics instance. It keeps no per-call state, and
+    this module stays imported across Streamlit reruns, so it is built once
+    per process.
+    """
+    return EvaluationMetrics()
+
+
+def _mean_per_model(rows, fields):
+    """
+    Average metric rows per model in one vectorized groupby.
+
+    Args:
+        rows: Dicts with a "model_id" key plus the metric keys
+        fields: Mapping of metric key -> output name
+
+    Returns:
+        {model_id: {output name: mean, ..., 'total_queries': n}}, models in
+        first-seen order
+    """
+    if not rows:
+        return {}
+
+    grouped = pd.DataFrame(rows).groupby("model_id", sort=False)
+    aggregated = grouped[list(fields)].mean().rename(columns=fields)
+    aggregated["total_queries"] = grouped.size()
+    return aggregated.to_dict("index")
+
+
+QUANTITATIVE_FIELDS = {
+    'response_time': 'avg_response_time',
+    'word_count': 'avg_word_count',
+    'sentence_count': 'avg_sentence_count',
+    'answer_length': 'avg_answer_length',
+}
+
+QUALITATIVE_FIELDS = {
+    'relevance': 'avg_relevance',
+    # 'factual_grounding': 'avg_factual_grounding',
+    'completeness': 'avg_completeness',
+    'clarity': 'avg_clarity',
+    'no_hallucination': 'avg_no_hallucination',
+    'overall_qualitative': 'overall_qualitative',
+}
+
+
+def _iter_evals(detailed_results):
+    """
+    Score every successful model answer once with both evaluators.
+
+    Yields:
+        (model_id, quantitative scores, qualitative scores)
+    """
+    evaluator = get_evaluator()
+
+    for query_result in detailed_results:
+        query = query_result.get('query', '')
+        for model_id, model_result in query_result.get('models', {}).items():
+            if model_result.get('answer') and not model_result.get('error'):
+                # Create result dict for evaluation
+                eval_result = {
+                    "answer": model_result['answer'],
+                    "context": "",  # Context not stored in comparison results
+                    "query": query,
+                    "response_time": model_result.get('response_time', 0),
+                    "baseline_results": {"results": []},
+                    "embedding_results": {"results": []}
+                }
+
+                quant = evaluator.evaluate_quantitative(eval_result)
+                if model_result.get('cached'):
+                    # Answer-cache hits (response time 0) stay out of the timing average
+                    quant['response_time'] = float('nan')
+
+                yield model_id, quant, evaluator.evaluate_qualitative(eval_result)
+
+
+def calculate_metrics(detailed_results):
+    """
+    Calculate quantitative and qualitative metrics for all models in a
+    single pass over the detailed results.
+
+    Returns:
+        (quantitative metrics, qualitative metrics), each keyed by model_id
+    """
+    quant_rows = []
+    qual_rows = []
+
+    for model_id, quant, qual in _iter_evals(detailed_results):
+        quant_rows.append({"model_id": model_id, **quant})
+        qual_rows.append({"model_id": model_id, **qual})
+
+    # Aggregate metrics per model
+    return (_mean_per_model(quant_rows, QUANTITATIVE_FIELDS),
+            _mean_per_model(qual_rows, QUALITATIVE_FIELDS))
+
+
+def calculate_quantitative_metrics(detailed_results):
+    """Calculate quantitative metrics for all models from detailed results"""
+    return calculate_metrics(detailed_results)[0]
+
+
+def calculate_qualitative_metrics(detailed_results):
+    """Calculate qualitative metrics for all models from detailed results"""
+    return calculate_metrics(detailed_results)[1]
@@ -133,7 +133,7 @@ def initialize_llm_handler(embedding_model: str):
     if st.session_state.llm_handler is None or st.session_state.get('current_embedding_model') != embedding_model:
         with st.status(f"🔄 Initializing System with {EMBEDDING_MODELS[embedding_model]['name']}...", expanded=True) as status:
             st.write("Loading embedding models...")
-            st.session_state.llm_handler = LLMHandler(embedding_model=embedding_model)
+            st.session_state.llm_handler = LLMHandler(embedding_model=embedding_model, warmup=True)
             st.session_state.current_embedding_model = embedding_model
             status.update(label="✅ System Initialized", state="complete", expanded=False)
 
@@ -3,8 +3,6 @@ import os
 import sys
 import json
 import re
-import spacy
-from spacy.pipeline import EntityRuler
 
 # Add the project root to the python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -65,6 +63,8 @@ class QueryPreprocessor:
         self.retriever = retriever
         
         # --- 1. Load spaCy Model ---
+        # Imported here so importing this module (e.g. for its constants) stays cheap
+        import spacy
         print("Loading NER models...")
         self.nlp = spacy.load("en_core_web_sm")
         
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -22,19 +23,24 @@ def get_answer(prompt, model="llama-3.1-8b-instant", temperature=0.1):
     )
     return response.choices[0].message.content
 
+@lru_cache(maxsize=None)
+def _openai_client(api_key):
+    """
+    One official OpenAI client per API key, kept separate from the global
+    Groq client. Reusing it keeps its connection pool (and TLS sessions)
+    alive across calls instead of reconnecting every time.
+    """
+    return OpenAI(api_key=api_key)
+
 def get_openai_gpt4_answer(prompt, model="gpt-4o", temperature=0.1):
     """
     Send a prompt to the official OpenAI API (GPT-4o) using OPENAI_API_KEY.
     """
-    # Create a transient client to avoid conflict with the global Groq client
-    # or rely on environment variables if using the default constructor.
-    from openai import OpenAI
-    
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return "Error: OPENAI_API_KEY not found in environment variables."
         
-    client = OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
     
     try:
         response = client.chat.completions.create(